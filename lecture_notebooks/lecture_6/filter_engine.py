@@ -0,0 +1,69 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+
+class FilterEngine:
+    """Exact-match filtering on several columns without scanning them.
+
+    Every column is encoded once as categorical codes, and each distinct value
+    keeps the sorted list of row positions holding it. A query intersects the
+    lists of its active fields, starting from the shortest, so its cost
+    depends on how many rows match rather than on the size of the table.
+    Results are cached per query.
+    """
+
+    def __init__(self, data, columns=None, cache_size=1024):
+        self.data = data
+        self.columns = {}
+        for column in columns if columns is not None else data.columns:
+            codes, uniques = pd.factorize(data[column])
+            # Rows grouped by value; a stable sort keeps each group ascending
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            # Text inputs give strings, so values are looked up by their text
+            lookup = {str(value): code for code, value in enumerate(uniques)}
+            self.columns[column] = (codes, order, bounds, lookup, uniques)
+        self._select = functools.lru_cache(maxsize=cache_size)(self._intersect)
+
+    def rows(self, column, value):
+        """Sorted row positions where `column` equals `value`."""
+        codes, order, bounds, lookup, _ = self.columns[column]
+        code = lookup.get(str(value))
+        if code is None:
+            return order[:0]
+        return order[bounds[code]:bounds[code + 1]]
+
+    def _intersect(self, filters):
+        if not filters:
+            return np.arange(len(self.data))
+        lists = sorted((self.rows(column, value) for column, value in filters), key=len)
+        selected = lists[0]
+        for rows in lists[1:]:
+            if not len(selected):
+                break
+            # Binary-search the few selected rows in the longer list
+            found = np.searchsorted(rows, selected)
+            found[found == len(rows)] = 0
+            selected = selected[rows[found] == selected] if len(rows) else rows
+        return selected
+
+    def select(self, filters):
+        """Sorted row positions matching every non-empty {column: value} filter."""
+        active = tuple(sorted((column, str(value)) for column, value in filters.items() if value))
+        return self._select(active)
+
+    def filter(self, filters):
+        """The rows of the data matching `filters`."""
+        return self.data.iloc[self.select(filters)]
+
+    def value_counts(self, column, rows):
+        """Counts of `column`'s values among `rows`, like value_counts() on the filtered frame."""
+        codes, _, _, _, uniques = self.columns[column]
+        codes = codes[rows]
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        present = np.flatnonzero(counts)
+        return pd.Series(counts[present], index=uniques[present], name="count").sort_values(
+            ascending=False, kind="stable"
+        )
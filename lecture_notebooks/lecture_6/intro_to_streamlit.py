@@ -6,6 +6,9 @@ import plotly.express as px
 from PIL import Image
 import time
 
+from filter_engine import FilterEngine
+from parquet_loader import read_parquet_rows
+
 st.title("This is my first Streamlit app!")
 st.header("This is a header")
 st.markdown("Stremlit is **_really_ cool**")
@@ -105,31 +108,52 @@ st.markdown("Stremlit is **_really_ cool**")
 
 # st.image(image)
 
+SHNIK_PATH = "shnik_2021.parquet"
+DATA_COLUMNS = ['Ազգանուն', "Անուն", 'Հայրանուն', 'Մարզ', 'Համայնք', 'Բնակավայր', 'հասցե', 'Ամսի համար', 'Տարի', 'Ամիս', 'Օր']
+
+
+@st.cache_resource
+def get_filter_engine(limit=500_000):
+    # Streams the first `limit` rows, renames and indexes them on the first run
+    # only; every rerun gets this same object, where st.cache_data would hand
+    # it a fresh unpickled copy of the rows. The engine caches each query.
+    data = read_parquet_rows(SHNIK_PATH, limit=limit)
+    file_columns = dict(zip(DATA_COLUMNS, data.columns))
+    data.columns = DATA_COLUMNS
+    return FilterEngine(data), file_columns
+
+
 @st.cache_data
-def read_shnik_data():
-    data = pd.read_parquet("shnik_2021.parquet")
-    return data.head(500_000)
+def search_whole_file(filters, limit=500_000):
+    # The filters (keyed by the file's column names) are pushed down to the
+    # Parquet reader, so only row groups that can match are read
+    return read_parquet_rows(SHNIK_PATH, filters=filters, limit=limit).set_axis(
+        DATA_COLUMNS, axis=1
+    )
 
 
 if __name__ == '__main__':
-    data = read_shnik_data()
-    data_columns = ['Ազգանուն', "Անուն", 'Հայրանուն', 'Մարզ', 'Համայնք', 'Բնակավայր', 'հասցե', 'Ամսի համար', 'Տարի', 'Ամիս', 'Օր']
-    data.columns = data_columns
-    st.write(data.head(50))
+    engine, file_columns = get_filter_engine()
+    st.write(engine.data.head(50))
 
     input_dict = {}
-    for el in data_columns:
+    for el in DATA_COLUMNS:
         input_dict[el] = st.text_input(el, "")
 
     print(input_dict)
-    tmp_data = data.copy()
-    for el, value in input_dict.items():
-        if value:
-            print(el, value)
-            tmp_data = tmp_data[tmp_data[el] == value]
-    st.write(tmp_data)
-    
-    st.bar_chart(tmp_data['Մարզ'].value_counts())
+    search_all = st.checkbox("Search the whole file, not just the first 500,000 rows")
+    if search_all and any(input_dict.values()):
+        filters = {
+            file_columns[column]: value for column, value in input_dict.items() if value
+        }
+        tmp_data = search_whole_file(filters)
+        st.write(tmp_data)
+        st.bar_chart(tmp_data['Մարզ'].value_counts())
+    else:
+        rows = engine.select(input_dict)
+        st.write(engine.data.iloc[rows])
+
+        st.bar_chart(engine.value_counts('Մարզ', rows))
     # st.hist(tmp_data['Տարի'].tolist())
     ## dashboard
     ## 1) input field for name, surename, middle name, anything else
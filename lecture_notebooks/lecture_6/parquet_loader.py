@@ -0,0 +1,80 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+def _typed_value(value, type):
+    """`value` (text from an input) as a value of the column's type, or None if it can't be one."""
+    if pa.types.is_string(type) or pa.types.is_large_string(type):
+        return str(value)
+    try:
+        return pc.cast(pa.scalar(str(value)), type).as_py()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def _may_match(row_group, column_indexes, filters):
+    """False when some filter value lies outside a column's min/max in this row group."""
+    for name, value in filters.items():
+        statistics = row_group.column(column_indexes[name]).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        try:
+            if value < statistics.min or value > statistics.max:
+                return False
+        except TypeError:  # Statistics of a type we can't compare with; read the group
+            continue
+    return True
+
+
+def read_parquet_rows(path, columns=None, filters=None, limit=None, batch_size=65_536):
+    """The first `limit` rows of a Parquet file where every {column: value} filter holds.
+
+    Only `columns` (and the filtered columns) are decoded, row groups whose
+    statistics rule out a filter value are skipped without reading them, and
+    the rest is streamed in batches and filtered batch by batch, so no more
+    than the matching rows is ever held. Reading stops once `limit` rows
+    have been found.
+    """
+    parquet = pq.ParquetFile(path)
+    schema = parquet.schema_arrow
+    if columns is None:
+        # Every data column; an index stored by pandas is not one
+        columns = [name for name in schema.names if not name.startswith("__index_level_")]
+    columns = list(columns)
+    output_schema = pa.schema([schema.field(name) for name in columns])
+
+    filters = {
+        name: _typed_value(value, schema.field(name).type)
+        for name, value in (filters or {}).items()
+        if value not in (None, "")
+    }
+    if any(value is None for value in filters.values()):
+        # e.g. letters typed into a numeric column: nothing can match
+        return output_schema.empty_table().to_pandas()
+    read_columns = columns + [name for name in filters if name not in columns]
+    column_indexes = {name: schema.get_field_index(name) for name in filters}
+
+    batches, found = [], 0
+    for index in range(parquet.num_row_groups):
+        if limit is not None and found >= limit:
+            break
+        if not _may_match(parquet.metadata.row_group(index), column_indexes, filters):
+            continue
+        for batch in parquet.iter_batches(
+            batch_size=batch_size, row_groups=[index], columns=read_columns
+        ):
+            if filters:
+                mask = None
+                for name, value in filters.items():
+                    matches = pc.equal(batch.column(name), value)
+                    mask = matches if mask is None else pc.and_(mask, matches)
+                batch = batch.filter(mask)
+            if limit is not None:
+                batch = batch.slice(0, limit - found)
+            if batch.num_rows:
+                batches.append(batch.select(columns))
+                found += batch.num_rows
+            if limit is not None and found >= limit:
+                break
+    return pa.Table.from_batches(batches, schema=output_schema).to_pandas()
@@ -0,0 +1,241 @@
+# netflix_dashboard/aggregates.py
+import numpy as np
+import pandas as pd
+
+# Width (in minutes) of the movie duration buckets stored in the cube. Movie
+# durations are whole minutes, so a width of 1 keeps the cube lossless.
+DURATION_BUCKET_WIDTH = 1
+
+CUBE_DIMENSIONS = [
+    "type",
+    "year_added",
+    "month_added",
+    "release_year",
+    "rating",
+    "seasons",
+    "duration_bucket",
+]
+
+# The dimension combinations counted, one small table per chart family. A
+# single table over every dimension has nearly as many cells as titles on a
+# real catalogue, so slicing it costs about as much as grouping the titles.
+CUBE_PROJECTIONS = [
+    ("type", "year_added", "month_added"),
+    ("type", "release_year"),
+    ("type", "rating"),
+    ("type", "seasons"),
+    ("type", "duration_bucket"),
+]
+
+
+class CountCube:
+    """Title counts over the combinations of the dashboard's filter dimensions.
+
+    Built once at load time as one table per projection in CUBE_PROJECTIONS;
+    callbacks answer slider moves by slicing and summing the smallest table
+    holding the dimensions they ask for, so their cost depends on the number
+    of distinct dimension combinations rather than on the number of titles.
+    """
+
+    def __init__(self, frames, cells=None, mask=None):
+        self.frames = frames
+        self._cells = cells
+        self._mask = mask
+        self._restricted = {}
+
+    def projection(self, dimensions):
+        """The smallest projection holding every one of `dimensions`."""
+        covering = [p for p in self.frames if set(dimensions) <= set(p)]
+        if not covering:
+            raise KeyError(f"No cube projection holds {sorted(dimensions)}")
+        return min(covering, key=lambda p: len(self.frames[p]))
+
+    def frame(self, projection):
+        """Cells and counts of one projection, recounted on first use when restricted."""
+        if self._mask is None:
+            return self.frames[projection]
+        if projection not in self._restricted:
+            frame = self.frames[projection]
+            counts = np.bincount(
+                self._cells[projection][self._mask], minlength=len(frame)
+            )
+            frame = frame.assign(count=counts)
+            self._restricted[projection] = frame[counts > 0].reset_index(drop=True)
+        return self._restricted[projection]
+
+    def query(self, by, where=None):
+        """Sums counts grouped by `by`, over the cells matching `where`.
+
+        `where` maps a dimension to an inclusive (low, high) range (either
+        bound may be None), a list/set of accepted values, or a single value.
+        Missing values never match.
+        """
+        where = where or {}
+        dimensions = [by] if isinstance(by, str) else list(by)
+        frame = self.frame(self.projection(dimensions + list(where)))
+        mask = np.ones(len(frame), dtype=bool)
+        for column, condition in where.items():
+            values = frame[column]
+            if isinstance(condition, tuple):
+                low, high = condition
+                matches = values.notna()
+                if low is not None:
+                    matches &= values >= low
+                if high is not None:
+                    matches &= values <= high
+            elif isinstance(condition, (list, set, frozenset)):
+                matches = values.isin(list(condition))
+            else:
+                matches = values == condition
+            mask &= matches.to_numpy(dtype=bool, na_value=False)
+        return frame[mask].groupby(by, observed=True)["count"].sum()
+
+    def total(self):
+        return int(self.frame(self.projection(["type"]))["count"].sum())
+
+    def n_cells(self):
+        """Cells stored over every projection."""
+        return sum(len(frame) for frame in self.frames.values())
+
+    def cells(self, df):
+        """Per projection, the position in its table of the cell each title of `df` is counted in."""
+        dims = cube_dimensions(df)
+        cells = {}
+        for projection, frame in self.frames.items():
+            projection = list(projection)
+            groups = dims.groupby(projection, dropna=False, observed=True)
+            keys = groups.size().reset_index()[projection]
+            positions = frame[projection].astype(keys.dtypes.to_dict())
+            positions["cell"] = np.arange(len(positions))
+            group_cells = keys.merge(positions, on=projection, how="left")["cell"]
+            cells[tuple(projection)] = group_cells.to_numpy(dtype=np.int64)[
+                groups.ngroup().to_numpy()
+            ]
+        return cells
+
+    def restrict(self, cells, mask):
+        """The cube counting only the titles selected by the boolean `mask`.
+
+        `cells` comes from cells(). Each projection a chart then queries is
+        recounted with one bincount over the selected titles, and cells left
+        empty are dropped.
+        """
+        return CountCube(self.frames, cells, mask)
+
+
+def nice_bin_width(values, counts, min_width=1):
+    """Histogram bin width for pre-counted values: Freedman-Diaconis, rounded up to 1/2/5 x 10^k."""
+    total = counts.sum()
+    if total < 2:
+        return min_width
+    q1, q3 = weighted_quantiles(values, counts, [0.25, 0.75])
+    width = 2 * (q3 - q1) / np.cbrt(total)
+    if width <= 0:
+        width = (values.max() - values.min()) / np.log2(total) or min_width
+    magnitude = 10 ** np.floor(np.log10(width))
+    for step in (1, 2, 5, 10):
+        if width <= step * magnitude:
+            return max(float(step * magnitude), min_width)
+
+
+def bin_counts(values, counts, width):
+    """Sums `counts` into bins of `width` aligned on multiples of it; returns (left edges, totals)."""
+    left = np.floor(values / width) * width
+    edges, inverse = np.unique(left, return_inverse=True)
+    return edges, np.bincount(inverse, weights=counts).astype(np.int64)
+
+
+def weighted_quantiles(values, counts, quantiles):
+    """Quantiles of the multiset where values[i] occurs counts[i] times.
+
+    Uses linear interpolation between order statistics, matching NumPy's
+    default and Plotly's box "linear" quartile method. `values` must be sorted.
+    """
+    cumulative = np.cumsum(counts)
+    positions = np.asarray(quantiles, dtype=float) * (cumulative[-1] - 1)
+    lower = values[np.searchsorted(cumulative, np.floor(positions), side="right")]
+    upper = values[np.searchsorted(cumulative, np.ceil(positions), side="right")]
+    return lower + (upper - lower) * (positions - np.floor(positions))
+
+
+def box_summary(values, counts):
+    """Box-plot statistics of pre-counted values, for a precomputed plotly Box trace.
+
+    Whiskers end at the most extreme values within 1.5 IQR of the quartiles,
+    as Plotly computes them from raw points. `values` must be sorted.
+    """
+    q1, median, q3 = weighted_quantiles(values, counts, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": inside.min(),
+        "upperfence": inside.max(),
+        "mean": np.average(values, weights=counts),
+    }
+
+
+def cube_dimensions(df):
+    """The cube's dimension columns for every title of a prepared Netflix frame."""
+    dims = df[[c for c in CUBE_DIMENSIONS if c != "duration_bucket"]].copy()
+    dims["duration_bucket"] = (
+        df["duration_min"] // DURATION_BUCKET_WIDTH * DURATION_BUCKET_WIDTH
+    )
+    return dims
+
+
+def _count_projection(dims, projection):
+    frame = (
+        dims.groupby(list(projection), dropna=False, observed=True)
+        .size()
+        .reset_index(name="count")
+    )
+    frame["count"] = frame["count"].astype(np.int64)
+    return frame
+
+
+def build_count_cube(df):
+    """Builds the CountCube for a prepared Netflix frame."""
+    dims = cube_dimensions(df)
+    return CountCube(
+        {projection: _count_projection(dims, projection) for projection in CUBE_PROJECTIONS}
+    )
+
+
+def _merge_frames(left, right, projection):
+    left, right = left.copy(), right.copy()
+    # Numeric dimensions may be Arrow-backed on one side (see data_loader.SHARED_DATA)
+    numeric = left.columns.difference(left.select_dtypes("category").columns)
+    right = right.astype(left.dtypes[numeric].to_dict())
+    for column in left.select_dtypes("category").columns:
+        categories = left[column].cat.categories
+        categories = categories.append(
+            right[column].cat.categories.difference(categories, sort=False)
+        )
+        left[column] = left[column].cat.set_categories(categories)
+        right[column] = right[column].cat.set_categories(categories)
+    frame = (
+        pd.concat([left, right], ignore_index=True)
+        .groupby(list(projection), dropna=False, observed=True)["count"]
+        .sum()
+        .reset_index()
+    )
+    frame["count"] = frame["count"].astype(np.int64)
+    return frame
+
+
+def merge_count_cubes(first, second):
+    """Adds two CountCubes built over disjoint sets of titles.
+
+    Categorical dimensions get the union of both cubes' categories, in
+    order of first appearance, so the merge equals building the cube over
+    the concatenated titles.
+    """
+    return CountCube(
+        {
+            projection: _merge_frames(frame, second.frames[projection], projection)
+            for projection, frame in first.frames.items()
+        }
+    )
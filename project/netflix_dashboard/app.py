@@ -1,10 +1,18 @@
+import os
+import time
 import dash
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 from dash.dependencies import Input, Output
+from app_logging import NAVIGATION_LOG_SAMPLE_RATE, get_logger
+from background import BACKGROUND_MANAGER, serve_cached_figures
+from components.filter_bar import FilterBar
 from components.navbar import Navbar
-from pages import overview, analysis_deep_dive
-from data_loader import GLOBAL_DF
+from metrics import instrument_app, timed_callback
+from pages import overview, analysis_deep_dive, search
+from data_loader import current_dataset
+
+logger = get_logger(__name__)
 
 # Initialize the Dash app
 app = dash.Dash(
@@ -14,28 +22,42 @@ app = dash.Dash(
 )
 server = app.server
 
+# Callback payload/timing metrics at /metrics. DASH_COMPRESSION optionally
+# compresses responses: "gzip", "br", or e.g. "br,gzip" in order of preference.
+RESPONSE_COMPRESSION = [
+    algorithm.strip()
+    for algorithm in os.environ.get("DASH_COMPRESSION", "").split(",")
+    if algorithm.strip()
+]
+instrument_app(app, compression=RESPONSE_COMPRESSION)
+
 app.title = "Netflix EDA Dashboard"
 
-navbar_component = Navbar()
-app.layout = html.Div(
-    [
-        dcc.Location(id="url", refresh=False),
-        navbar_component,
-        dbc.Container(id="page-content", fluid=True),
-    ]
-)
+
+def serve_layout():
+    # A function, so the filter bar's options follow dataset reloads
+    return html.Div(
+        [
+            dcc.Location(id="url", refresh=False),
+            Navbar(),
+            FilterBar(),
+            # The global cross-filter every chart callback takes as its last input
+            dcc.Store(id="crossfilter-store", data={}),
+            dbc.Container(id="page-content", fluid=True),
+        ]
+    )
+
+
+app.layout = serve_layout
 
 
 # Callback to update page content based on URL
 @app.callback(Output("page-content", "children"), [Input("url", "pathname")])
+@timed_callback
 def display_page(pathname):
-    print(f"--- app.py: display_page CALLBACK TRIGGERED ---")
-    print(f"--- app.py: Current pathname: {pathname}, Type: {type(pathname)} ---")
-
-    if GLOBAL_DF is None:
-        print(
-            "--- app.py: display_page: GLOBAL_DF is None. Returning error message. ---"
-        )
+    started = time.perf_counter()
+    if current_dataset() is None:
+        logger.error("Dataset not loaded; rendering error page", extra={"path": pathname})
         return dbc.Container(
             [
                 html.H1("Error Loading Data", className="text-danger"),
@@ -47,33 +69,14 @@ def display_page(pathname):
 
     # Handle specific paths
     if pathname == "/analysis-deep-dive":
-        print("--- app.py: display_page: Routing to Analysis Deep Dive page. ---")
-        try:
-            return analysis_deep_dive.layout()
-        except Exception as e:
-            print(f"--- app.py: ERROR in analysis_deep_dive.layout(): {e} ---")
-            return html.Pre(f"Error rendering Analysis Deep Dive page: {e}")
-    elif pathname == "/overview":
-        print("--- app.py: display_page: Routing to Overview page. ---")
-        try:
-            return overview.layout()
-        except Exception as e:
-            print(f"--- app.py: ERROR in overview.layout(): {e} ---")
-            return html.Pre(f"Error rendering Overview page: {e}")
+        route, render = "analysis_deep_dive", analysis_deep_dive.layout
+    elif pathname == "/search":
+        route, render = "search", search.layout
     # Handle base path or initial load (pathname can be None initially)
-    elif pathname == "/" or pathname is None:
-        print(
-            f"--- app.py: display_page: Pathname is '{pathname}'. Routing to default Overview page. ---"
-        )
-        try:
-            return overview.layout()
-        except Exception as e:
-            print(f"--- app.py: ERROR in overview.layout() for default route: {e} ---")
-            return html.Pre(f"Error rendering default Overview page: {e}")
+    elif pathname in ("/overview", "/") or pathname is None:
+        route, render = "overview", overview.layout
     else:
-        print(
-            f"--- app.py: display_page: Pathname '{pathname}' not recognized. Returning 404. ---"
-        )
+        _log_navigation(pathname, "not_found", started)
         return html.Div(
             [
                 html.H1("404: Page Not Found", className="text-center"),
@@ -85,23 +88,59 @@ def display_page(pathname):
             style={"padding": "20px"},
         )
 
+    try:
+        page = render()
+    except Exception as e:
+        logger.exception("Error rendering page", extra={"path": pathname, "route": route})
+        return html.Pre(f"Error rendering {route} page: {e}")
+    _log_navigation(pathname, route, started)
+    return page
 
-print("--- app.py: display_page callback defined ---")
 
-if __name__ == "__main__":
-    print("--- app.py: Entered __main__ block ---")
-    if GLOBAL_DF is not None:
-        print(
-            "--- app.py: __main__: GLOBAL_DF seems loaded. Attempting to start Dash server... ---"
-        )
-        app.run(debug=True, port=8051)
-    else:
-        print(
-            "--- app.py: __main__: GLOBAL_DF is None. Dash server will probably not work correctly or display data error. ---"
-        )
-        # Still try to run the server to see the error message from display_page if GLOBAL_DF is None
-        app.run(debug=True, port=8051)
-else:
-    print("--- app.py: Not in __main__ block (e.g., when imported by Gunicorn) ---")
+def _log_navigation(pathname, route, started):
+    # Every navigation passes through here, so only a sample is logged
+    logger.info(
+        "Page rendered",
+        extra={
+            "path": pathname,
+            "route": route,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "sample_rate": NAVIGATION_LOG_SAMPLE_RATE,
+        },
+    )
+
+
+# Background jobs are forked from this process. Render every figure once
+# first so plotly's lazily imported modules are already loaded: a job forked
+# while another thread holds a module's import lock would block on it forever.
+# The cross-filter bitmaps and search index are built here too, or every job
+# would rebuild them
+if BACKGROUND_MANAGER is not None:
+    from warmup import default_states
+
+    # Registered after instrument_app, so cache hits are still measured
+    serve_cached_figures(app)
+
+    for func, args in default_states():
+        func(*args)
+    if current_dataset() is not None:
+        current_dataset().crossfilter
+        current_dataset().search_index
 
-print("--- app.py: Script execution finished or server started ---")
+# Optionally pre-render every discrete callback state so cold workers answer from cache
+if os.environ.get("FIGURE_CACHE_WARMUP", "0") == "1":
+    from warmup import start_background_warmup
+
+    start_background_warmup()
+
+# Optionally poll the CSV and swap in new dataset versions without a restart
+if float(os.environ.get("NETFLIX_RELOAD_INTERVAL", "0")) > 0:
+    from reloader import RELOAD_INTERVAL, start_reloader
+
+    start_reloader(RELOAD_INTERVAL)
+
+if __name__ == "__main__":
+    if current_dataset() is None:
+        # Still start the server, so display_page can show the error page
+        logger.warning("Dataset not loaded; the dashboard will show an error page")
+    app.run(debug=True, port=8051)
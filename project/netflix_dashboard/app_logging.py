@@ -0,0 +1,123 @@
+# netflix_dashboard/app_logging.py
+"""Structured, non-blocking logging for the dashboard.
+
+Modules log through get_logger(__name__). Records are put on an in-memory
+queue by the calling thread and written to stdout by a background
+listener, so request threads never wait on console I/O. Output is one
+JSON object per line by default (LOG_FORMAT=text for local reading), and
+any `extra` fields become JSON keys, e.g. route timings.
+
+Hot paths can pass extra={"sample_rate": 0.1} to keep only that share of
+their records; kept records carry the rate so aggregations can scale
+counts back up.
+
+    LOG_LEVEL=DEBUG LOG_FORMAT=text python app.py
+"""
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+# Share of page navigations logged by display_page
+NAVIGATION_LOG_SAMPLE_RATE = float(os.environ.get("NAVIGATION_LOG_SAMPLE_RATE", "0.1"))
+
+ROOT_LOGGER = "netflix_dashboard"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def _extra_fields(record):
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRIBUTES}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with `extra` fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        fields = " ".join(f"{k}={v}" for k, v in _extra_fields(record).items())
+        line = super().format(record)
+        return f"{line} {fields}" if fields else line
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a record with probability record.sample_rate (1 if unset)."""
+
+    def filter(self, record):
+        return random.random() < getattr(record, "sample_rate", 1.0)
+
+
+_setup_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+
+
+def _start_listener():
+    """Starts a fresh queue and listener thread behind the shared queue handler."""
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()  # Flushes whatever is still queued
+
+
+def setup_logging():
+    """Configures the dashboard's loggers once per process; later calls do nothing."""
+    global _queue_handler
+    with _setup_lock:
+        if _queue_handler is not None:
+            return
+        _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(SamplingFilter())
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(LOG_LEVEL)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+        _start_listener()
+        atexit.register(_stop_listener)
+        # The listener thread does not survive a fork (e.g. gunicorn workers
+        # forked after on_starting loaded the data), so give each child its own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_start_listener)
+
+
+def get_logger(name):
+    """Logger for a dashboard module, e.g. get_logger(__name__)."""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,28 @@
+// netflix_dashboard/assets/overview_clientside.js
+// Clientside callbacks for the Overview page (see pages/overview.py).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    overview: {
+        // Rebuilds a per-year figure from the series in its dcc.Store, keeping
+        // only the years inside the selected [min, max] slider range.
+        filterYearRange: function (yearRange, series) {
+            if (!series || !yearRange) {
+                return window.dash_clientside.no_update;
+            }
+            var minYear = yearRange[0];
+            var maxYear = yearRange[1];
+            var keep = [];
+            series.x.forEach(function (year, i) {
+                if (year >= minYear && year <= maxYear) {
+                    keep.push(i);
+                }
+            });
+            var data = series.traces.map(function (trace, t) {
+                return Object.assign({}, trace, {
+                    x: keep.map(function (i) { return series.x[i]; }),
+                    y: keep.map(function (i) { return series.y[t][i]; }),
+                });
+            });
+            return { data: data, layout: series.layout };
+        },
+    },
+});
@@ -0,0 +1,216 @@
+# netflix_dashboard/background.py
+"""Runs the heaviest page callbacks as Dash background callbacks.
+
+With BACKGROUND_CALLBACKS=1 (and `pip install "dash[diskcache]"`), the
+callbacks that take background_callback_options() run in a subprocess
+forked from the worker, with results passed back through a diskcache
+directory shared by every gunicorn worker on the host. The worker thread
+that received the request returns at once instead of blocking on the
+computation.
+
+- Superseded work is cancelled: when a slider moves again before the
+  previous job has finished, Dash's renderer reports the old job and it is
+  killed. Jobs are also cancelled when the user navigates away.
+- At most BACKGROUND_MAX_JOBS jobs compute at once, host-wide. Further
+  jobs wait for a slot. Slots are file locks, so a killed job frees its
+  slot immediately.
+- The figure cache is consulted in the request thread: a cached figure is
+  returned as the response to the first request, with no job, slot or
+  poll. When a job's result is collected, the worker stores it in its own
+  figure cache, since the job's cache write is lost with its process under
+  the memory backend. So are its profile and compute metrics: /profile and
+  /metrics only see the request threads.
+
+    BACKGROUND_CALLBACKS=1 BACKGROUND_MAX_JOBS=4 gunicorn app:server
+"""
+import contextlib
+import inspect
+import json
+import os
+import threading
+import time
+
+import flask
+import plotly.graph_objects as go
+from dash.dependencies import Input
+
+from app_logging import get_logger
+from data_loader import CACHE_DIR
+from figure_cache import cached_payload, store_figure
+from metrics import CALLBACK_PATH_SUFFIX
+
+try:
+    import diskcache
+    import fcntl
+    from dash import DiskcacheManager
+except ImportError:  # Background callbacks are optional
+    diskcache = None
+
+BACKGROUND_CALLBACKS = os.environ.get("BACKGROUND_CALLBACKS", "0") == "1"
+BACKGROUND_MAX_JOBS = int(os.environ.get("BACKGROUND_MAX_JOBS", str(os.cpu_count() or 1)))
+BACKGROUND_CACHE_DIR = os.environ.get(
+    "BACKGROUND_CACHE_DIR", os.path.join(CACHE_DIR, "background")
+)
+# How often (ms) the browser polls for a background result
+BACKGROUND_POLL_INTERVAL = int(os.environ.get("BACKGROUND_POLL_INTERVAL", "250"))
+SLOT_WAIT_SECONDS = 0.01
+# How long a job's figure cache key is kept if its result is never collected
+FIGURE_KEY_EXPIRE_SECONDS = 3600
+
+logger = get_logger(__name__)
+
+
+@contextlib.contextmanager
+def job_slot(slot_dir, limit):
+    """Holds one of `limit` host-wide slots, waiting for one to free up.
+
+    A slot is an exclusive flock on one of `limit` files in `slot_dir`; the
+    kernel drops it when the holder exits, even when the job is killed.
+    """
+    os.makedirs(slot_dir, exist_ok=True)
+    while True:
+        for slot in range(limit):
+            lock_file = open(os.path.join(slot_dir, f"slot-{slot}.lock"), "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            try:
+                yield slot
+            finally:
+                lock_file.close()  # Releases the lock
+            return
+        time.sleep(SLOT_WAIT_SECONDS)
+
+
+if diskcache is not None:
+
+    class BoundedDiskcacheManager(DiskcacheManager):
+        """DiskcacheManager whose jobs compute only while holding one of `max_jobs` slots."""
+
+        def __init__(self, cache, max_jobs, **kwargs):
+            super().__init__(cache, **kwargs)
+            self.max_jobs = max_jobs
+            # A job forked while another request thread is inside a cache
+            # write (terminate_job keeps one open while it waits for the
+            # killed job) inherits SQLite's in-process lock state and blocks
+            # on its own result write until the cache times out. Forks and
+            # this manager's writes therefore never overlap.
+            self._fork_lock = threading.RLock()
+
+        def call_job_fn(self, key, job_fn, args, context):
+            with self._fork_lock:
+                cache_key = getattr(job_fn, "cache_key", None)
+                if cache_key is not None:
+                    self.handle.set(
+                        f"{key}-figure", cache_key(*args), expire=FIGURE_KEY_EXPIRE_SECONDS
+                    )
+                return super().call_job_fn(key, job_fn, args, context)
+
+        def get_result(self, key, job):
+            """The job's result; a figure is also stored in this worker's figure cache."""
+            with self._fork_lock:
+                result = super().get_result(key, job)
+                figure_key = None
+                if result is not self.UNDEFINED:
+                    figure_key = self.handle.pop(f"{key}-figure", None)
+            if figure_key is not None and isinstance(result, go.Figure):
+                store_figure(figure_key, result)
+            return result
+
+        def terminate_job(self, job):
+            with self._fork_lock:
+                return super().terminate_job(job)
+
+        def clear_cache_entry(self, key):
+            with self._fork_lock:
+                return super().clear_cache_entry(key)
+
+        def get_updated_props(self, key):
+            with self._fork_lock:
+                return super().get_updated_props(key)
+
+        def get_or_create_signing_secret(self, generate):
+            with self._fork_lock:
+                return super().get_or_create_signing_secret(generate)
+
+        def make_job_fn(self, fn, progress, key=None):
+            job_fn = super().make_job_fn(fn, progress, key)
+            slot_dir, max_jobs = os.path.join(self.handle.directory, "slots"), self.max_jobs
+
+            def bounded_job_fn(*args, **kwargs):
+                with job_slot(slot_dir, max_jobs):
+                    return job_fn(*args, **kwargs)
+
+            # Set by cached_figure: the figure cache key of the job's arguments
+            bounded_job_fn.cache_key = getattr(fn, "cache_key", None)
+            return bounded_job_fn
+
+
+def _make_manager():
+    if not BACKGROUND_CALLBACKS:
+        return None
+    if diskcache is None:
+        logger.warning(
+            'BACKGROUND_CALLBACKS needs `pip install "dash[diskcache]"`; '
+            "callbacks run in the request thread"
+        )
+        return None
+    return BoundedDiskcacheManager(
+        diskcache.Cache(BACKGROUND_CACHE_DIR), max_jobs=BACKGROUND_MAX_JOBS
+    )
+
+
+BACKGROUND_MANAGER = _make_manager()
+
+
+def background_callback_options():
+    """Extra @callback arguments for a callback worth running in the background.
+
+    Empty when background callbacks are disabled, so the callback runs as
+    before.
+    """
+    if BACKGROUND_MANAGER is None:
+        return {}
+    return {
+        "background": True,
+        "manager": BACKGROUND_MANAGER,
+        "interval": BACKGROUND_POLL_INTERVAL,
+        # Navigating away cancels a job whose chart is no longer shown
+        "cancel": [Input("url", "pathname")],
+    }
+
+
+def serve_cached_figures(app):
+    """Answers background figure callbacks from the figure cache in the request thread.
+
+    The renderer takes a full response to a background callback's first
+    request as its result, so a hit costs no job, slot or poll; only a miss
+    falls through to Dash and starts a job.
+    """
+
+    def answer_from_cache():
+        request = flask.request
+        if not request.path.endswith(CALLBACK_PATH_SUFFIX) or request.args.get("cacheKey"):
+            return None
+        body = request.get_json(silent=True) or {}
+        callback = app.callback_map.get(body.get("output"), {})
+        if not callback.get("background"):
+            return None
+        # The cached_figure callback beneath Dash's wrapper
+        func = inspect.unwrap(callback["callback"], stop=lambda f: hasattr(f, "cache_key"))
+        if not hasattr(func, "cache_key"):
+            return None
+        args = [item.get("value") for item in body.get("inputs", []) + body.get("state", [])]
+        payload = cached_payload(func.cache_key(*args))
+        if payload is None:
+            return None
+        component_id, prop = body["output"].rsplit(".", 1)
+        return flask.Response(
+            f'{{"multi": true, "response": {{{json.dumps(component_id)}: '
+            f"{{{json.dumps(prop)}: {payload}}}}}}}",
+            mimetype="application/json",
+        )
+
+    app.server.before_request(answer_from_cache)
@@ -0,0 +1,203 @@
+# netflix_dashboard/benchmarks/bench_background_callbacks.py
+"""Benchmark: callback throughput while several users drag a slider at once.
+
+Each simulated user drags the overview's top-N slider through --steps
+values, one every --step-ms, sending a callback request per value the way
+the browser does. Once the drag ends, the user waits for the chart to show
+the last value. Every mode runs in a fresh process through Dash's callback
+endpoint (Flask test client), with the figure cache disabled:
+
+- foreground: each request computes its figure in the request thread
+- background: requests start background jobs (BACKGROUND_CALLBACKS=1),
+  each new value cancels the user's previous job, and the final one is polled
+
+Reported per mode: slider interactions per second (values dragged through,
+over the time until every user's final chart arrived), chart updates per
+second (figures the client actually received; in background mode polls
+and cancelled jobs deliver none), the figures computed (foreground only),
+and the settle time from the end of a drag to its final chart (p50/max).
+
+    python benchmarks/bench_background_callbacks.py [--users 8] [--steps 20] [--max-jobs 2]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_DIR = os.path.dirname(BENCH_DIR)
+CALLBACK_URL = "/_dash-update-component"
+OUTPUT = "top-directors-bar.figure"
+# The top-N slider's range (pages/overview.py)
+TOP_N_MIN, TOP_N_MAX = 3, 15
+
+
+def _payload(top_n):
+    return {
+        "output": OUTPUT,
+        "outputs": {"id": "top-directors-bar", "property": "figure"},
+        "inputs": [
+            {"id": "top-n-slider", "property": "value", "value": top_n},
+            {"id": "crossfilter-store", "property": "data", "value": {}},
+        ],
+        "changedPropIds": ["top-n-slider.value"],
+        "state": [],
+    }
+
+
+def _update(client, top_n, figures):
+    """One foreground callback request; appends 1 to `figures` if it returned the chart."""
+    body = client.post(CALLBACK_URL, json=_payload(top_n)).get_json(silent=True)
+    if body is not None and "response" in body:
+        figures.append(1)
+
+
+def _drag(client, values, step_s, background, poll_s, results):
+    """One user's drag; appends (settle seconds, chart updates received) to `results`."""
+    pending = []
+    figures = []
+    job = None
+    for top_n in values:
+        query = {"oldJob": job} if background and job else {}
+        if background:
+            response = client.post(CALLBACK_URL, json=_payload(top_n), query_string=query)
+            handles = response.get_json()
+            job = handles["job"]
+        else:
+            # The browser does not wait for a response before sending the next value
+            thread = threading.Thread(target=_update, args=(client, top_n, figures))
+            thread.start()
+            pending.append(thread)
+        time.sleep(step_s)
+    drag_ended = time.perf_counter()
+    if background:
+        while True:
+            response = client.post(
+                CALLBACK_URL,
+                json=_payload(values[-1]),
+                query_string={"cacheKey": handles["cacheKey"], "job": handles["job"]},
+            )
+            body = response.get_json(silent=True)
+            # No body: the job ended without a result (it was cancelled)
+            if body is None:
+                break
+            if "response" in body:
+                figures.append(1)
+                break
+            time.sleep(poll_s)
+    else:
+        for thread in pending:
+            thread.join()
+    results.append((time.perf_counter() - drag_ended, len(figures)))
+
+
+def measure(users, steps, step_s, poll_s):
+    """Runs inside the per-mode subprocess."""
+    sys.path.insert(0, DASHBOARD_DIR)
+    import app as dashboard
+    from background import BACKGROUND_MANAGER
+    from profiling import STATS
+
+    client = dashboard.app.server.test_client()
+    client.post(CALLBACK_URL, json=_payload(10))  # Warm up imports and Dash's routing
+    STATS.clear()
+    background = BACKGROUND_MANAGER is not None
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=_drag,
+            args=(
+                client,
+                [
+                    TOP_N_MIN + (user + step) % (TOP_N_MAX - TOP_N_MIN + 1)
+                    for step in range(steps)
+                ],
+                step_s,
+                background,
+                poll_s,
+                results,
+            ),
+        )
+        for user in range(users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    settle = np.array([seconds for seconds, _ in results])
+    # Background jobs profile themselves in the job process, so count what
+    # this process computed only in foreground mode
+    computed = sum(stats.calls for stats in STATS.values()) if not background else None
+    return {
+        "elapsed": elapsed,
+        "interactions_per_second": users * steps / elapsed,
+        "updates_per_second": sum(figures for _, figures in results) / elapsed,
+        "computed": computed,
+        "settle_p50": float(np.median(settle)),
+        "settle_max": float(settle.max()),
+    }
+
+
+def run_mode(mode, args):
+    env = dict(
+        os.environ,
+        FIGURE_CACHE_BACKEND="memory",
+        FIGURE_CACHE_SIZE="0",
+        BACKGROUND_CALLBACKS="1" if mode == "background" else "0",
+        BACKGROUND_MAX_JOBS=str(args.max_jobs),
+        LOG_LEVEL="WARNING",
+    )
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--measure",
+        "--users", str(args.users),
+        "--steps", str(args.steps),
+        "--step-ms", str(args.step_ms),
+        "--poll-ms", str(args.poll_ms),
+    ]
+    output = subprocess.run(
+        command, env=env, cwd=DASHBOARD_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--step-ms", type=float, default=30)
+    parser.add_argument("--poll-ms", type=float, default=50)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        result = measure(args.users, args.steps, args.step_ms / 1000, args.poll_ms / 1000)
+        print(json.dumps(result))
+        return
+
+    print(
+        f"users: {args.users}, steps: {args.steps}, step: {args.step_ms:g}ms, "
+        f"max jobs: {args.max_jobs}, cores: {os.cpu_count()}"
+    )
+    for mode in ("foreground", "background"):
+        result = run_mode(mode, args)
+        computed = "" if result["computed"] is None else f"  computed {result['computed']}"
+        print(
+            f"{mode:>10}: {result['interactions_per_second']:.1f} interactions/s  "
+            f"{result['updates_per_second']:.1f} chart updates/s{computed}  "
+            f"settle p50 {result['settle_p50']:.2f}s  max {result['settle_max']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# netflix_dashboard/benchmarks/bench_count_cube.py
+"""Benchmark: cube-backed chart queries, raw titles vs one full cube vs per-chart projections.
+
+Loads a synthetic catalogue from generate_catalogue.py. Its rows are
+bootstrapped from the real catalogue, so every combination of the cube's
+dimensions already occurs at 8,781 titles; to let the number of cells grow
+with the catalogue the way new titles would, each title's date added,
+release year and movie duration are jittered first. Then times the queries
+behind the cube-backed charts three ways:
+
+- rows: grouping the titles themselves
+- full cube: one table over every dimension in CUBE_DIMENSIONS
+- projections: CountCube, one small table per chart family
+
+All three are checked to agree.
+
+    python benchmarks/bench_count_cube.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_catalogue import catalogue_path, generate  # noqa: E402
+from aggregates import (  # noqa: E402
+    CUBE_DIMENSIONS,
+    CountCube,
+    build_count_cube,
+    cube_dimensions,
+)
+from data_loader import load_and_prepare_data  # noqa: E402
+
+# (by, where) of the chart queries timed
+QUERIES = {
+    "content type": ("type", None),
+    "release year": ("release_year", None),
+    "added by type": (["year_added", "type"], None),
+    "monthly 2019": (["month_added", "type"], {"year_added": 2019}),
+    "seasons": ("seasons", {"type": "TV Show", "seasons": (None, 8)}),
+    "durations": ("duration_bucket", {"type": "Movie", "duration_bucket": (60, 180)}),
+    "ratings": ("rating", {"rating": ["TV-MA", "R", "PG-13"]}),
+}
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def jitter(df, seed=0):
+    """`df` with date added, release year and movie duration spread around their values."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    n = len(df)
+    df["month_added"] = df["month_added"].where(
+        df["month_added"].isna(), rng.integers(1, 13, n)
+    ).astype(df["month_added"].dtype)
+    df["year_added"] = (df["year_added"] - rng.integers(0, 3, n)).astype(df["year_added"].dtype)
+    df["release_year"] = (
+        (df["release_year"] - rng.integers(0, 6, n)).astype(df["release_year"].dtype)
+    )
+    df["duration_min"] = (
+        (df["duration_min"] + rng.integers(-15, 16, n)).clip(lower=1)
+    ).astype(df["duration_min"].dtype)
+    return df
+
+
+def full_cube(df):
+    """A CountCube holding a single table over every dimension."""
+    frame = (
+        cube_dimensions(df).groupby(CUBE_DIMENSIONS, dropna=False, observed=True)
+        .size()
+        .reset_index(name="count")
+    )
+    return CountCube({tuple(CUBE_DIMENSIONS): frame})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        path = catalogue_path(n_rows)
+        if not os.path.exists(path):
+            generate(n_rows, path)
+        df = jitter(load_and_prepare_data(path))
+        titles = cube_dimensions(df)
+        full, projected = full_cube(df), build_count_cube(df)
+        rows = CountCube({tuple(CUBE_DIMENSIONS): titles.assign(count=1)})
+        print(
+            f"\n{len(df):,} titles  full cube: {full.n_cells():,} cells  "
+            f"projections: {projected.n_cells():,} cells"
+        )
+        print(f"{'query':<15}{'rows ms':>9}{'full cube ms':>14}{'projections ms':>16}")
+        for name, (by, where) in QUERIES.items():
+            expected = rows.query(by, where)
+            for cube in (full, projected):
+                result = cube.query(by, where)
+                assert list(result.index) == list(expected.index), name
+                assert list(result.values) == list(expected.values), name
+            rows_s, full_s, projected_s = (
+                best_of(lambda: cube.query(by, where)) for cube in (rows, full, projected)
+            )
+            print(
+                f"{name:<15}{rows_s * 1000:>9.2f}{full_s * 1000:>14.2f}"
+                f"{projected_s * 1000:>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# netflix_dashboard/benchmarks/bench_crossfilter.py
+"""Benchmark: five-way cross-filter selection, column masks vs packed bitmaps.
+
+Loads a synthetic catalogue from generate_catalogue.py and times, for a few
+selections over type, year-added range, ratings, genres and countries:
+
+- masks: a fresh boolean mask per filter over the prepared frame, ANDed
+- bitmaps: CrossFilterIndex.mask(), bitwise OR/AND over packed bitmaps
+- restrict: recounting the cube over the selection (CountCube.restrict)
+  and summing one chart's projection of it, as a cube-backed chart does
+
+Both selections are checked to agree. The one-off index build is reported too.
+
+    python benchmarks/bench_crossfilter.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_catalogue import catalogue_path, generate  # noqa: E402
+from crossfilter import CROSSFILTER_DIMENSIONS  # noqa: E402
+from data_loader import Dataset, load_and_prepare_data  # noqa: E402
+
+SELECTIONS = {
+    "one-way": {"type": ["Movie"]},
+    "three-way": {"type": ["Movie"], "year_added": [2016, 2019], "rating": ["TV-MA", "R"]},
+    "five-way": {
+        "type": ["Movie"],
+        "year_added": [2016, 2019],
+        "rating": ["TV-MA", "R", "PG-13"],
+        "genre": ["Dramas", "Comedies"],
+        "country": ["United States", "India", "France"],
+    },
+}
+
+
+def _listed_any(column, values):
+    """Titles whose comma-separated `column` lists any of `values`."""
+    pattern = "|".join(f"(?:^|,)\\s*{value}\\s*(?:,|$)" for value in values)
+    return column.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+
+
+def column_mask(df, crossfilter):
+    """The cross-filter as independent boolean masks over the frame's columns."""
+    mask = np.ones(len(df), dtype=bool)
+    for dimension in CROSSFILTER_DIMENSIONS:
+        condition = crossfilter.get(dimension)
+        if not condition:
+            continue
+        if dimension == "year_added":
+            low, high = condition
+            matches = df["year_added"].between(low, high).to_numpy(dtype=bool, na_value=False)
+        elif dimension == "genre":
+            matches = _listed_any(df["listed_in"], condition)
+        elif dimension == "country":
+            matches = _listed_any(df["country"].astype("string"), condition)
+        else:
+            matches = df[dimension].isin(condition).to_numpy(dtype=bool)
+        mask &= matches
+    return mask
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    path = catalogue_path(args.rows)
+    if not os.path.exists(path):
+        generate(args.rows, path)
+    dataset = Dataset(load_and_prepare_data(path))
+    df = dataset.df
+
+    started = time.perf_counter()
+    index = dataset.crossfilter
+    build_s = time.perf_counter() - started
+    bitmap_bytes = sum(d.bitmaps.nbytes for d in index.dimensions.values())
+    print(
+        f"titles: {len(df):,}  index build: {build_s:.2f}s  "
+        f"bitmaps: {bitmap_bytes / 1e6:.1f} MB"
+    )
+
+    print(f"{'selection':<11}{'selected':>10}{'masks ms':>10}{'bitmaps ms':>12}"
+          f"{'speedup':>9}{'restrict ms':>13}")
+    for name, crossfilter in SELECTIONS.items():
+        expected = column_mask(df, crossfilter)
+        selected = index.mask(crossfilter)
+        assert (selected == expected).all(), name
+        masks_s = best_of(lambda: column_mask(df, crossfilter))
+        bitmaps_s = best_of(lambda: index.mask(crossfilter))
+        restrict_s = best_of(
+            lambda: dataset.cube.restrict(index.cells, selected).query("release_year")
+        )
+        print(
+            f"{name:<11}{int(selected.sum()):>10,}{masks_s * 1000:>10.1f}"
+            f"{bitmaps_s * 1000:>12.2f}{masks_s / bitmaps_s:>8.0f}x{restrict_s * 1000:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
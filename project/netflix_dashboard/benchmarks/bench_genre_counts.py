@@ -0,0 +1,67 @@
+# netflix_dashboard/benchmarks/bench_genre_counts.py
+"""Microbenchmark: list-of-lists + Counter genre counting vs the genre index.
+
+    python benchmarks/bench_genre_counts.py [--scale 1 10 100]
+
+`--scale` replicates the catalogue to show how both approaches grow.
+"""
+import argparse
+import os
+import sys
+import timeit
+from collections import Counter
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_loader import GLOBAL_DF, build_genre_index  # noqa: E402
+
+
+def legacy_genre_counts(df_filtered):
+    """The previous get_genre_counts implementation, kept for comparison."""
+    all_genres = [
+        genre for sublist in df_filtered["genres_list"].dropna() for genre in sublist
+    ]
+    genre_counts = Counter(all_genres)
+    return pd.DataFrame(genre_counts.items(), columns=["genre", "count"]).sort_values(
+        by="count", ascending=False
+    )
+
+
+def best_of(func, repeat=5):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f"{'titles':>9} {'filter':<8}{'legacy ms':>11}{'index ms':>10}{'speedup':>9}")
+    for scale in args.scale:
+        df = pd.concat([GLOBAL_DF] * scale, ignore_index=True)
+        df["genres_list"] = df["listed_in"].dropna().str.split(", ")
+        index = build_genre_index(df)
+
+        for content_type in ("All", "Movie", "TV Show"):
+            if content_type == "All":
+                filtered, mask = df, None
+            else:
+                mask = (df["type"] == content_type).to_numpy(dtype=bool)
+                filtered = df[mask]
+
+            legacy = legacy_genre_counts(filtered).set_index("genre")["count"]
+            assert legacy.sort_index().equals(index.counts(mask).sort_index())
+
+            legacy_s = best_of(lambda: legacy_genre_counts(filtered))
+            index_s = best_of(lambda: index.counts(mask))
+            print(
+                f"{len(df):>9} {content_type:<8}{legacy_s * 1e3:>11.2f}"
+                f"{index_s * 1e3:>10.3f}{legacy_s / index_s:>8.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# netflix_dashboard/benchmarks/bench_parallel_prepare.py
+"""Benchmark: prepare_data speedup versus the number of worker processes.
+
+Times the full preparation (global dedup plus the per-row steps) of a
+synthetic catalogue from generate_catalogue.py for each worker count, and
+checks every parallel result against the serial one.
+
+    python benchmarks/bench_parallel_prepare.py [--rows 1000000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_catalogue import catalogue_path, generate  # noqa: E402
+from preparation import prepare_data  # noqa: E402
+
+
+def _default_workers():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=_default_workers())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = catalogue_path(args.rows)
+    if not os.path.exists(path):
+        generate(args.rows, path)
+    raw = pd.read_csv(path)
+    print(f"rows: {len(raw)}, cores: {os.cpu_count()}")
+
+    serial = None
+    baseline_s = None
+    for workers in args.workers:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            prepared = prepare_data(raw.copy(), workers=workers)
+            best = min(best, time.perf_counter() - started)
+        if serial is None:
+            serial, baseline_s = prepared, best
+        else:
+            pd.testing.assert_frame_equal(prepared, serial)
+        print(f"workers={workers:>3}: {best:.2f}s  speedup {baseline_s / best:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
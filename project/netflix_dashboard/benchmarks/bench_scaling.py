@@ -0,0 +1,173 @@
+# netflix_dashboard/benchmarks/bench_scaling.py
+"""Scaling benchmark: times loading and every page callback per catalogue size.
+
+Each size runs in a fresh process with NETFLIX_DATA_PATH pointing at a
+synthetic catalogue (generated on first use), so import-time loading is
+measured the way a gunicorn worker pays it. Layouts and callbacks are
+called through their .uncached builders, bypassing the layout and figure
+caches. Results are written as JSON for comparison
+between commits:
+
+    python benchmarks/bench_scaling.py --rows 10000 100000 1000000 10000000
+    python benchmarks/bench_scaling.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+REGRESSION_THRESHOLD = 1.2  # Flag timings that got >20% slower in --compare
+
+
+def _once(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def _best_of(func, repeat=3):
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def measure():
+    """Runs inside the per-size subprocess; returns {benchmark name: seconds}."""
+    sys.path.insert(0, DASHBOARD_DIR)
+    timings = {}
+
+    started = time.perf_counter()
+    import data_loader
+
+    timings["import data_loader"] = time.perf_counter() - started
+    timings["load_and_prepare_data (csv)"] = _once(
+        lambda: data_loader.load_and_prepare_data(use_cache=False)
+    )
+    timings["load_and_prepare_data (cached)"] = _once(data_loader.load_and_prepare_data)
+
+    movie_mask = (data_loader.GLOBAL_DF["type"] == "Movie").to_numpy(
+        dtype=bool, na_value=False
+    )
+    timings["get_genre_counts (all)"] = _best_of(data_loader.get_genre_counts)
+    timings["get_genre_counts (movies)"] = _best_of(
+        lambda: data_loader.get_genre_counts(mask=movie_mask)
+    )
+
+    from pages import analysis_deep_dive, overview
+    import warmup
+
+    # The raw builders: the wrapped layouts are cached per dataset version
+    timings["overview.layout"] = _best_of(overview.layout.uncached)
+    timings["analysis_deep_dive.layout"] = _best_of(analysis_deep_dive.layout.uncached)
+    for func, args in warmup.default_states():
+        name = f"{func.__module__}.{func.__name__}"
+        uncached = getattr(func, "uncached", func)
+        timings[name] = _best_of(lambda: uncached(*args))
+    return timings
+
+
+def run_size(n_rows):
+    from generate_catalogue import catalogue_path, generate
+
+    path = catalogue_path(n_rows)
+    if not os.path.exists(path):
+        print(f"Generating {n_rows} rows...", flush=True)
+        generate(n_rows, path)
+
+    env = dict(os.environ, NETFLIX_DATA_PATH=path)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure"],
+        env=env,
+        cwd=DASHBOARD_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    # The last line is the JSON payload; anything before it is loader chatter
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=DASHBOARD_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    for size, new_timings in new["results"].items():
+        old_timings = old["results"].get(size, {})
+        for name, seconds in new_timings.items():
+            if name not in old_timings:
+                continue
+            ratio = seconds / old_timings[name] if old_timings[name] else float("inf")
+            flag = "  REGRESSION" if ratio > REGRESSION_THRESHOLD else ""
+            print(
+                f"{size:>10} {name:<60}{old_timings[name] * 1e3:>10.2f}ms"
+                f"{seconds * 1e3:>10.2f}ms{ratio:>7.2f}x{flag}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument("--output", help="JSON file to write (default: results/scaling-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure()))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    import numpy
+    import pandas
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pandas": pandas.__version__,
+            "numpy": numpy.__version__,
+            "machine": platform.machine(),
+        },
+        "results": {},
+    }
+    for n_rows in args.rows:
+        report["results"][str(n_rows)] = timings = run_size(n_rows)
+        print(f"\n{n_rows} rows")
+        for name, seconds in timings.items():
+            print(f"  {name:<60}{seconds * 1e3:>12.2f}ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"scaling-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# netflix_dashboard/benchmarks/bench_search.py
+"""Benchmark: title/director/country search, inverted index vs column scans.
+
+Loads a synthetic catalogue from generate_catalogue.py and times, for typeahead
+prefixes, whole words and multi-word queries:
+
+- scan: str.contains over the normalized title, director and country columns
+  (every query word must start a word in one of them), as a filter without an
+  index would do it
+- index: SearchIndex lookup of the matching titles and their ranking, bypassing
+  the per-query cache (a typeahead keystroke is usually a new query)
+- top: ranking the best 25 of those matches, as the search page shows them
+
+Both are checked to select the same titles. The one-off index build is reported too.
+
+    python benchmarks/bench_search.py [--rows 1000000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_catalogue import catalogue_path, generate  # noqa: E402
+from data_loader import Dataset, load_and_prepare_data  # noqa: E402
+from search import SEARCH_FIELDS, tokenize, words  # noqa: E402
+
+QUERIES = ["s", "st", "star", "star wa", "martin scor", "united kingdom", "love india"]
+
+
+def scan_matches(columns, query):
+    """Positions of the titles where every query word starts a word of some searched column."""
+    matched = np.ones(len(columns[0]), dtype=bool)
+    for term in tokenize(query):
+        pattern = rf"(?:^| ){re.escape(term)}"
+        hits = np.zeros(len(matched), dtype=bool)
+        for column in columns:
+            hits |= column.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+        matched &= hits
+    return np.flatnonzero(matched)
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    path = catalogue_path(args.rows)
+    if not os.path.exists(path):
+        generate(args.rows, path)
+    dataset = Dataset(load_and_prepare_data(path))
+    df = dataset.df
+
+    started = time.perf_counter()
+    index = dataset.search_index
+    build_s = time.perf_counter() - started
+    index_bytes = sum(
+        a.nbytes for a in (index.offsets, index.postings, index.weights, index.title_lengths)
+    )
+    print(
+        f"titles: {len(df):,}  index build: {build_s:.2f}s  tokens: {len(index.vocabulary):,}  "
+        f"postings: {len(index.postings):,} ({index_bytes / 1e6:.1f} MB)"
+    )
+
+    columns = [
+        df[column].astype(object).map(lambda v: " ".join(words(v)), na_action="ignore")
+        for column in SEARCH_FIELDS
+    ]
+    print(f"{'query':<16}{'matches':>10}{'scan ms':>10}{'index ms':>10}{'speedup':>9}{'top ms':>8}")
+    for query in QUERIES:
+        terms = tuple(tokenize(query))
+        matched = index.matches(query)
+        assert np.array_equal(matched, scan_matches(columns, query)), query
+        scan_s = best_of(lambda: scan_matches(columns, query), repeat=1)
+        index_s = best_of(lambda: index._query_scores(terms))
+        top_s = best_of(lambda: index.search(query, limit=25))
+        print(
+            f"{query!r:<16}{len(matched):>10,}{scan_s * 1000:>10.0f}{index_s * 1000:>10.2f}"
+            f"{scan_s / index_s:>8.0f}x{top_s * 1000:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# netflix_dashboard/benchmarks/bench_top_k.py
+"""Benchmark: top-15 directors, value_counts().head() vs sorted TopK tables.
+
+Loads a synthetic catalogue from generate_catalogue.py and times, with no
+cross-filter, a content-type-only filter and a mixed one:
+
+- value_counts: the old callback, value_counts() over the selected directors
+- top_k: Dataset.top_values(), a table slice or one bincount plus a partial sort
+
+Both are checked to return the same directors and counts.
+
+    python benchmarks/bench_top_k.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generate_catalogue import catalogue_path, generate  # noqa: E402
+from crossfilter import apply_crossfilter  # noqa: E402
+from data_loader import Dataset, load_and_prepare_data  # noqa: E402
+
+TOP_N = 15
+SELECTIONS = {
+    "none": {},
+    "type only": {"type": ["Movie"]},
+    "mixed": {"type": ["Movie"], "rating": ["TV-MA", "R"], "country": ["India", "France"]},
+}
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    path = catalogue_path(args.rows)
+    if not os.path.exists(path):
+        generate(args.rows, path)
+    dataset = Dataset(load_and_prepare_data(path))
+    directors = dataset.df["director"]
+    print(f"titles: {len(directors):,}  directors: {len(directors.cat.categories):,}")
+
+    print(f"{'filter':<11}{'value_counts ms':>17}{'top_k ms':>10}{'speedup':>9}")
+    for name, crossfilter in SELECTIONS.items():
+        _, mask = apply_crossfilter(dataset, crossfilter)
+        selected = directors if mask is None else directors[mask]
+
+        def old():
+            return selected.dropna().value_counts().head(TOP_N)
+
+        def new():
+            return dataset.top_values("director", TOP_N, crossfilter, mask)
+
+        expected, result = old(), new()
+        assert list(expected.index) == list(result.index), name
+        assert list(expected.values) == list(result.values), name
+        old_s, new_s = best_of(old), best_of(new)
+        print(f"{name:<11}{old_s * 1000:>17.1f}{new_s * 1000:>10.3f}{old_s / new_s:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# netflix_dashboard/benchmarks/bench_worker_memory.py
+"""Reports per-worker memory for private vs shared (memory-mapped) datasets.
+
+Each simulated worker is a fresh process that imports data_loader, touches
+every column and then waits until all of its siblings are alive, so that
+PSS (proportional set size) reflects how pages are actually shared.
+
+    python benchmarks/bench_worker_memory.py [--csv path/to/catalogue.csv]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_COUNTS = (1, 4, 16)
+
+
+def read_memory_kb():
+    """Returns (rss, pss) in kB for the current process, from /proc."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+
+def worker(shared, barrier, results):
+    os.environ["NETFLIX_SHARED_DATA"] = "1" if shared else "0"
+    sys.path.insert(0, DASHBOARD_DIR)
+    import pandas  # noqa: F401  Baseline includes the libraries every worker imports
+    import pyarrow  # noqa: F401
+
+    rss_before, _ = read_memory_kb()
+    from data_loader import GLOBAL_DF
+
+    # Touch every column the way the page callbacks would
+    for column in GLOBAL_DF.columns:
+        GLOBAL_DF[column].isna().sum()
+    barrier.wait()
+    rss, pss = read_memory_kb()
+    results.put((rss_before, rss, pss))
+    barrier.wait()  # Stay alive until every sibling has measured
+
+
+def run(n_workers, shared):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(shared, barrier, results))
+        for _ in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    samples = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    n = len(samples)
+    return (
+        sum(s[1] - s[0] for s in samples) / n,
+        sum(s[1] for s in samples) / n,
+        sum(s[2] for s in samples) / n,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", help="Catalogue to load instead of data/netflix.csv")
+    args = parser.parse_args()
+    if args.csv:
+        os.environ["NETFLIX_DATA_PATH"] = os.path.abspath(args.csv)
+
+    # Build the cache up front, as gunicorn.conf.py does in the master
+    run(1, shared=True)
+
+    print(f"{'mode':<8}{'workers':>8}{'data MB':>10}{'RSS MB':>10}{'PSS MB':>10}")
+    for shared in (False, True):
+        for n_workers in WORKER_COUNTS:
+            data_kb, rss_kb, pss_kb = run(n_workers, shared)
+            print(
+                f"{'shared' if shared else 'private':<8}{n_workers:>8}"
+                f"{data_kb / 1024:>10.1f}{rss_kb / 1024:>10.1f}{pss_kb / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
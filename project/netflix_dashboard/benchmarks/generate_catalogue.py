@@ -0,0 +1,105 @@
+# netflix_dashboard/benchmarks/generate_catalogue.py
+"""Writes synthetic Netflix-schema catalogues for scaling benchmarks.
+
+Rows are bootstrapped from data/netflix.csv, so date added, release year,
+rating, duration and genres keep their real joint distribution per content
+type. Titles are made unique (plus a small share of case-variant duplicates
+to exercise dedup), directors are drawn from a pool that grows with the
+catalogue under a Zipf-like popularity curve, and some countries become
+co-productions.
+
+    python benchmarks/generate_catalogue.py --rows 10000 100000 1000000 10000000
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(BASE_DIR, "data", "netflix.csv")
+OUTPUT_DIR = os.path.join(BASE_DIR, "benchmarks", "data")
+CHUNK_ROWS = 500_000
+
+DUPLICATE_RATE = 0.001  # Share of rows re-using an earlier title
+MISSING_DIRECTOR_RATE = 0.29
+CO_PRODUCTION_RATE = 0.15
+
+
+def catalogue_path(n_rows, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, f"netflix_{n_rows}.csv")
+
+
+def _director_pool(source, n_rows):
+    real = source.loc[source["director"] != "Not Given", "director"].unique()
+    size = max(len(real), n_rows // 3)
+    weights = 1.0 / np.arange(1, size + 1) ** 0.8
+    return real, weights / weights.sum()
+
+
+def generate_chunk(source, start, n_rows, real_directors, director_p, rng):
+    """Returns one chunk of synthetic rows with ids starting at `start`."""
+    chunk = source.iloc[rng.integers(0, len(source), n_rows)].reset_index(drop=True)
+    ids = np.arange(start, start + n_rows)
+
+    chunk["show_id"] = "s" + pd.Series(ids + 1).astype(str)
+    chunk["title"] = chunk["title"] + " #" + pd.Series(ids).astype(str)
+    duplicates = np.flatnonzero(rng.random(n_rows) < DUPLICATE_RATE)
+    if len(duplicates):
+        originals = rng.integers(0, np.maximum(duplicates, 1))
+        chunk.loc[duplicates, "title"] = chunk.loc[originals, "title"].str.upper().to_numpy()
+
+    pool_idx = rng.choice(len(director_p), size=n_rows, p=director_p)
+    names = pd.Series("Director " + pd.Series(pool_idx).astype(str))
+    from_real = pool_idx < len(real_directors)
+    names[from_real] = real_directors[pool_idx[from_real]]
+    names[rng.random(n_rows) < MISSING_DIRECTOR_RATE] = "Not Given"
+    chunk["director"] = names
+
+    co_produced = (rng.random(n_rows) < CO_PRODUCTION_RATE) & (
+        chunk["country"] != "Not Given"
+    ).to_numpy()
+    partners = source["country"].to_numpy()[rng.integers(0, len(source), n_rows)]
+    keep = co_produced & (partners != "Not Given") & (partners != chunk["country"])
+    chunk.loc[keep, "country"] = chunk.loc[keep, "country"] + ", " + partners[keep]
+    return chunk
+
+
+def generate(n_rows, path=None, seed=0):
+    """Writes an n_rows catalogue to `path` in bounded-memory chunks; returns the path."""
+    path = path or catalogue_path(n_rows)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(SOURCE_PATH, dtype=str)
+    real_directors, director_p = _director_pool(source, n_rows)
+
+    tmp_path = f"{path}.tmp"
+    for start in range(0, n_rows, CHUNK_ROWS):
+        chunk = generate_chunk(
+            source,
+            start,
+            min(CHUNK_ROWS, n_rows - start),
+            real_directors,
+            director_p,
+            rng,
+        )
+        chunk.to_csv(tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for n_rows in args.rows:
+        path = generate(n_rows, catalogue_path(n_rows, args.output_dir), args.seed)
+        print(f"{n_rows:>10} rows -> {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# netflix_dashboard/components/filter_bar.py
+import dash_bootstrap_components as dbc
+from dash import callback, dcc, html
+from dash.dependencies import Input, Output, State
+
+from crossfilter import crossfilter_state
+from data_loader import current_dataset
+from figure_cache import cached_layout
+from metrics import timed_callback
+
+
+@cached_layout
+def FilterBar():
+    """Cross-filter controls shared by both pages; they write the crossfilter-store in app.layout."""
+    dataset = current_dataset()
+    if dataset is None:
+        return html.Div()
+    df = dataset.df
+    years = df["year_added"].dropna()
+    min_year, max_year = (int(years.min()), int(years.max())) if len(years) else (2000, 2025)
+    # Genres and countries most common first, as picking from ~100 names is easier that way
+    genres = dataset.genre_index.counts().index.tolist()
+    countries = dataset.country_index.counts().index.tolist()
+
+    return dbc.Card(
+        dbc.CardBody(
+            [
+                dbc.Row(
+                    [
+                        dbc.Col(
+                            dbc.Switch(
+                                id="crossfilter-enabled",
+                                label="Cross-filter every chart",
+                                value=False,
+                            ),
+                            width="auto",
+                        ),
+                        dbc.Col(
+                            html.Small(
+                                "Cross-filter off",
+                                id="crossfilter-status",
+                                className="text-muted",
+                            ),
+                            width="auto",
+                        ),
+                        dbc.Col(
+                            # Set from the search page, or typed here directly
+                            dcc.Input(
+                                id="crossfilter-search",
+                                type="search",
+                                value="",
+                                debounce=True,
+                                placeholder="Search titles, directors, countries",
+                                className="form-control form-control-sm",
+                            ),
+                            width=12,
+                            lg=4,
+                            className="ms-lg-auto",
+                        ),
+                    ],
+                    align="center",
+                ),
+                dbc.Row(
+                    [
+                        dbc.Col(
+                            dcc.RadioItems(
+                                id="crossfilter-type",
+                                options=[
+                                    {"label": "All", "value": "All"},
+                                    {"label": "Movies", "value": "Movie"},
+                                    {"label": "TV Shows", "value": "TV Show"},
+                                ],
+                                value="All",
+                                inline=True,
+                                labelStyle={"margin-right": "10px"},
+                            ),
+                            width=12,
+                            lg=2,
+                        ),
+                        dbc.Col(
+                            dcc.RangeSlider(
+                                id="crossfilter-year-added",
+                                min=min_year,
+                                max=max_year,
+                                step=1,
+                                value=[min_year, max_year],
+                                marks={
+                                    year: str(year)
+                                    for year in range(min_year, max_year + 1, 2)
+                                },
+                            ),
+                            width=12,
+                            lg=4,
+                        ),
+                        dbc.Col(
+                            dcc.Dropdown(
+                                id="crossfilter-rating",
+                                options=sorted(df["rating"].dropna().unique().tolist()),
+                                multi=True,
+                                placeholder="Ratings",
+                            ),
+                            width=12,
+                            lg=2,
+                        ),
+                        dbc.Col(
+                            dcc.Dropdown(
+                                id="crossfilter-genre",
+                                options=genres,
+                                multi=True,
+                                placeholder="Genres",
+                            ),
+                            width=12,
+                            lg=2,
+                        ),
+                        dbc.Col(
+                            dcc.Dropdown(
+                                id="crossfilter-country",
+                                options=countries,
+                                multi=True,
+                                placeholder="Countries",
+                            ),
+                            width=12,
+                            lg=2,
+                        ),
+                    ],
+                    className="mt-2",
+                    align="center",
+                ),
+            ]
+        ),
+        className="mb-4 mx-3",
+    )
+
+
+# The controls start out matching the empty store, so there is no initial call
+@callback(
+    Output("crossfilter-store", "data"),
+    Output("crossfilter-status", "children"),
+    Input("crossfilter-enabled", "value"),
+    Input("crossfilter-type", "value"),
+    Input("crossfilter-year-added", "value"),
+    Input("crossfilter-rating", "value"),
+    Input("crossfilter-genre", "value"),
+    Input("crossfilter-country", "value"),
+    Input("crossfilter-search", "value"),
+    State("crossfilter-year-added", "min"),
+    State("crossfilter-year-added", "max"),
+    prevent_initial_call=True,
+)
+@timed_callback
+def update_crossfilter(
+    enabled, content_type, year_added, ratings, genres, countries, search, min_year, max_year
+):
+    crossfilter = crossfilter_state(
+        enabled,
+        content_type,
+        year_added,
+        [min_year, max_year],
+        ratings,
+        genres,
+        countries,
+        search,
+    )
+    dataset = current_dataset()
+    if not enabled:
+        return crossfilter, "Cross-filter off"
+    if not crossfilter or dataset is None:
+        return crossfilter, "All titles selected"
+    mask = dataset.crossfilter.mask(crossfilter)
+    return crossfilter, f"{int(mask.sum()):,} of {len(mask):,} titles selected"
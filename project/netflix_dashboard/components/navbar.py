@@ -7,6 +7,7 @@ def Navbar():
         children=[
             dbc.NavItem(dbc.NavLink("Overview", href="/overview")),
             dbc.NavItem(dbc.NavLink("Analysis Deep Dive", href="/analysis-deep-dive")),
+            dbc.NavItem(dbc.NavLink("Search", href="/search")),
         ],
         brand="Netflix Content Dashboard",
         brand_href="/overview",  # Default page
@@ -0,0 +1,119 @@
+# netflix_dashboard/crossfilter.py
+"""Global cross-filter: one selection of titles applied to every chart on both pages.
+
+The selection lives in the app-wide "crossfilter-store" (see
+components/filter_bar.py) as a dict with only the active filters, e.g.
+
+    {"type": ["Movie"], "year_added": [2016, 2019], "rating": ["TV-MA", "R"],
+     "genre": ["Dramas"], "country": ["France"], "search": "star wars"}
+
+Values within a filter are ORed and the filters are ANDed; "search" keeps
+the titles matching a search-page query (search.SearchIndex.matches). Each filter is
+answered from packed per-value bitmaps (indexes.BitmapIndex), so a
+five-way selection is a handful of bitwise ORs/ANDs over n_titles / 8
+bytes. Charts then recount their projection of the cube from the selected
+titles with one bincount (CountCube.restrict) or pass the mask to the
+multi-value indexes.
+"""
+import numpy as np
+
+from indexes import build_bitmap_index, unpack_mask
+
+# Filters in the store, with the column or index they select on
+CROSSFILTER_DIMENSIONS = ("type", "year_added", "rating", "genre", "country", "search")
+
+
+class CrossFilterIndex:
+    """Bitmaps over every cross-filter dimension of one dataset, plus each title's cube cells."""
+
+    def __init__(self, dataset):
+        df = dataset.df
+        self.dataset = dataset
+        self.n_rows = len(df)
+        self.dimensions = {
+            "type": build_bitmap_index(df["type"]),
+            "year_added": build_bitmap_index(df["year_added"], ordered=True),
+            "rating": build_bitmap_index(df["rating"]),
+            # A title matches a genre or country if it is any of its listed ones
+            "genre": dataset.genre_index.bitmap_index(),
+            "country": dataset.country_index.bitmap_index(),
+        }
+        self.cells = dataset.cube.cells(df)
+
+    def select(self, crossfilter):
+        """Packed bitmap of the titles matching every active filter, or None if none is active."""
+        selected = None
+        for dimension in CROSSFILTER_DIMENSIONS:
+            condition = (crossfilter or {}).get(dimension)
+            if not condition:
+                continue
+            if dimension == "search":
+                bitmap = self.search(condition)
+            elif dimension == "year_added":
+                bitmap = self.dimensions[dimension].between(*condition)
+            else:
+                bitmap = self.dimensions[dimension].any_of(condition)
+            selected = bitmap if selected is None else np.bitwise_and(selected, bitmap)
+        return selected
+
+    def search(self, query):
+        """Packed bitmap of the titles matching a search query.
+
+        The search index is only built once a search is applied to the charts.
+        """
+        matched = np.zeros(self.n_rows, dtype=bool)
+        matched[self.dataset.search_index.matches(query)] = True
+        return np.packbits(matched)
+
+    def mask(self, crossfilter):
+        """Boolean mask over the titles matching the cross-filter, or None if none is active."""
+        selected = self.select(crossfilter)
+        return None if selected is None else unpack_mask(selected, self.n_rows)
+
+
+def apply_crossfilter(dataset, crossfilter):
+    """The dataset's cube and a title mask, both narrowed to the cross-filter.
+
+    Returns (dataset.cube, None) when no filter is active, so charts keep
+    using the precomputed cube.
+    """
+    if not crossfilter:
+        return dataset.cube, None
+    index = dataset.crossfilter
+    mask = index.mask(crossfilter)
+    if mask is None:
+        return dataset.cube, None
+    return dataset.cube.restrict(index.cells, mask), mask
+
+
+def combine_masks(first, second):
+    """ANDs two optional title masks; None means every title."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return first & second
+
+
+def crossfilter_state(
+    enabled, content_type, year_added, year_bounds, ratings, genres, countries, search=None
+):
+    """The store value for the filter bar's controls: only the filters narrowing the selection."""
+    if not enabled:
+        return {}
+    state = {
+        "type": [content_type] if content_type and content_type != "All" else [],
+        "rating": sorted(ratings or []),
+        "genre": sorted(genres or []),
+        "country": sorted(countries or []),
+        "search": (search or "").strip(),
+    }
+    if year_added and list(year_added) != list(year_bounds):
+        state["year_added"] = [int(year_added[0]), int(year_added[1])]
+    return {dimension: value for dimension, value in state.items() if value}
+
+
+def toggle_value(values, value):
+    """`values` with `value` added, or removed if it was already selected."""
+    values = list(values or [])
+    return [v for v in values if v != value] if value in values else values + [value]
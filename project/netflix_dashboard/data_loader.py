@@ -1,95 +1,359 @@
 # netflix_dashboard/data_loader.py
+import glob
+import hashlib
 import os
+import threading
+from contextlib import contextmanager
 import pandas as pd
-import numpy as np
-from collections import Counter
+
+from aggregates import build_count_cube
+from app_logging import get_logger
+from crossfilter import CrossFilterIndex
+from indexes import build_multi_value_index
+from preparation import (  # noqa: F401  Re-exported for existing callers
+    DATE_FORMATS,
+    SCHEMA,
+    apply_schema,
+    parse_dates,
+    prepare_data,
+)
+from search import build_search_index
+from topk import build_top_k, build_top_k_from_index
+
+try:
+    import pyarrow as pa
+except ImportError:  # The prepared-data cache is optional
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the cache lock becomes a no-op
+    fcntl = None
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_PATH = os.path.join(BASE_DIR, "data", "netflix.csv")
-print("DATA PATH", DATA_PATH)
+DATA_PATH = os.environ.get(
+    "NETFLIX_DATA_PATH", os.path.join(BASE_DIR, "data", "netflix.csv")
+)
+CACHE_DIR = os.path.join(BASE_DIR, "data", ".cache")
+# When enabled, every process attaches to the same memory-mapped Arrow file
+# instead of holding its own copy of the frame (see gunicorn.conf.py).
+SHARED_DATA = os.environ.get("NETFLIX_SHARED_DATA", "0") == "1"
+# Bump whenever the steps in preparation.py change the prepared frame,
+# so caches written by older code are never picked up.
+CACHE_SCHEMA_VERSION = 6
+
+logger = get_logger(__name__)
+
+
+def content_digest(file_path, length=None):
+    """sha256 of the file's first `length` bytes (the whole file by default)."""
+    digest = hashlib.sha256()
+    remaining = float("inf") if length is None else length
+    with open(file_path, "rb") as f:
+        while remaining > 0:
+            block = f.read(int(min(1 << 20, remaining)))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(file_path=DATA_PATH, digest=None):
+    """Hash of the source file's content and mtime, used to key the prepared-data cache."""
+    digest = digest or content_digest(file_path)
+    mtime_ns = os.stat(file_path).st_mtime_ns
+    key = f"v{CACHE_SCHEMA_VERSION}:{mtime_ns}:{digest}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def source_info(file_path, digest):
+    """What the reloader needs to tell an append from any other change to the source."""
+    stat = os.stat(file_path)
+    with open(file_path, "rb") as f:
+        f.seek(max(stat.st_size - 1, 0))
+        ends_with_newline = f.read(1) in (b"\n", b"")
+    return {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": digest,
+        "ends_with_newline": ends_with_newline,
+    }
+
+
+def source_key(file_path):
+    """Short hash of the source's absolute path, so each source file gets its own caches."""
+    return hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:12]
+
+
+def cache_path_for(fingerprint, file_path=DATA_PATH):
+    """Location of the Arrow IPC cache file for a given source file and fingerprint."""
+    return os.path.join(CACHE_DIR, f"prepared-{source_key(file_path)}-{fingerprint}.arrow")
 
 
-def load_and_prepare_data(file_path=DATA_PATH):
-    """Loads and prepares the Netflix dataset."""
+@contextmanager
+def cache_lock():
+    """Inter-process lock so only one worker builds the cache while the others wait for it."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_prepared_cache(fingerprint, file_path=DATA_PATH, zero_copy=False):
+    """Memory-maps a previously written prepared frame, or returns None on a miss.
+
+    With zero_copy=True the columns are Arrow-backed views over the mapped
+    file, so the pages are shared by every process attached to it.
+    """
+    path = cache_path_for(fingerprint, file_path)
+    if pa is None or not os.path.exists(path):
+        return None
     try:
-        df = pd.read_csv(file_path)
-    except FileNotFoundError:
-        print(f"Error: The file {file_path} was not found. Please check the path.")
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if zero_copy:
+            # Dictionary columns stay pandas categoricals; only their small codes are copied
+            return table.to_pandas(
+                types_mapper=lambda t: None
+                if pa.types.is_dictionary(t)
+                else pd.ArrowDtype(t)
+            )
+        return table.to_pandas()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning("Ignoring unreadable data cache", extra={"path": path, "error": str(e)})
         return None
 
-    # Convert 'date_added' to datetime objects
-    df["date_added"] = pd.to_datetime(df["date_added"], errors="coerce")
 
-    # Create a normalized title column for deduplication
-    df["normalized_title"] = df["title"].str.lower().str.strip()
-    df = df.drop_duplicates(subset="normalized_title", keep="first")
+def write_prepared_cache(df, fingerprint, file_path=DATA_PATH):
+    """Writes the prepared frame as uncompressed Arrow IPC so it can be memory-mapped."""
+    if pa is None:
+        return None
+    path = cache_path_for(fingerprint, file_path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)  # Atomic, so concurrent workers never see a partial file
+    except (OSError, pa.ArrowException) as e:
+        logger.warning("Could not write data cache", extra={"path": path, "error": str(e)})
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
 
-    if "show_id" in df.columns:
-        df["show_id"] = df["show_id"].str.replace("s", "", regex=False).astype(int)
+    # Caches for older versions of this CSV are never read again; other
+    # sources' caches (benchmarks, NETFLIX_DATA_PATH overrides) are kept
+    stale_caches = glob.glob(
+        os.path.join(CACHE_DIR, f"prepared-{source_key(file_path)}-*.arrow")
+    )
+    # Caches named before they were scoped by source are never read either
+    stale_caches += glob.glob(os.path.join(CACHE_DIR, "prepared-" + "?" * 16 + ".arrow"))
+    for stale in stale_caches:
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return path
 
-    # Extract year and month from 'date_added'
-    df["year_added"] = df["date_added"].dt.year
-    df["month_added"] = df["date_added"].dt.month
-    df["month_name_added"] = df["date_added"].dt.strftime("%B")  # Full month name
 
-    # Clean duration for Movies
-    movie_mask = df["type"] == "Movie"
-    if "duration" in df.columns:
-        df.loc[movie_mask, "duration_min"] = pd.to_numeric(
-            df.loc[movie_mask, "duration"].str.replace(" min", "", regex=False),
-            errors="coerce",
+def load_and_prepare_data(file_path=DATA_PATH, use_cache=True, shared=SHARED_DATA):
+    """Loads and prepares the Netflix dataset, reusing the prepared-data cache when the CSV is unchanged."""
+    try:
+        digest = content_digest(file_path)
+        fingerprint = source_fingerprint(file_path, digest)
+    except FileNotFoundError:
+        logger.error(
+            "Data file not found; please check the path", extra={"path": file_path}
         )
+        return None
+
+    if not use_cache:
+        df = prepare_data(pd.read_csv(file_path))
+    else:
+        with cache_lock():
+            df = read_prepared_cache(fingerprint, file_path, zero_copy=shared)
+            if df is None:
+                df = prepare_data(pd.read_csv(file_path))
+                if write_prepared_cache(df, fingerprint, file_path) and shared:
+                    # Drop the private copy and attach to the file like every other worker
+                    shared_df = read_prepared_cache(fingerprint, file_path, zero_copy=True)
+                    if shared_df is not None:
+                        df = shared_df
+
+    # Identifies this dataset for anything derived from it, e.g. the figure cache
+    df.attrs["version"] = fingerprint
+    df.attrs["source"] = source_info(file_path, digest)
+    return df
+
+
+def memory_report(file_path=DATA_PATH):
+    """Per-column memory of the prepared frame before and after applying SCHEMA."""
+    before = prepare_data(pd.read_csv(file_path), typed=False)
+    after = apply_schema(before.copy())
+    report = pd.DataFrame(
+        {
+            "dtype_before": before.dtypes.astype(str),
+            "bytes_before": before.memory_usage(index=False, deep=True),
+            "dtype_after": after.dtypes.astype(str),
+            "bytes_after": after.memory_usage(index=False, deep=True),
+        }
+    )
+    report.loc["TOTAL", ["bytes_before", "bytes_after"]] = report[
+        ["bytes_before", "bytes_after"]
+    ].sum()
+    report["saved_pct"] = (
+        100 * (1 - report["bytes_after"] / report["bytes_before"])
+    ).round(1)
+    return report
 
-        # Clean duration for TV Shows (number of seasons)
-        tv_show_mask = df["type"] == "TV Show"
-        df.loc[tv_show_mask, "seasons"] = pd.to_numeric(
-            df.loc[tv_show_mask, "duration"].str.split(" ").str[0], errors="coerce"
-        )
-        df["seasons"] = df["seasons"].astype("Int64")  # Use nullable integer type
 
-    # Process 'listed_in' for genre analysis
+def build_genre_index(df):
+    """Exploded, integer-coded (title, genre) index over the 'listed_in' column."""
     if "listed_in" in df.columns:
-        df["genres_list"] = df["listed_in"].dropna().str.split(", ")
+        listed_in = df["listed_in"]
     else:
-        df["genres_list"] = pd.Series([[] for _ in range(len(df))])
+        listed_in = pd.Series([None] * len(df), dtype=object)
+    return build_multi_value_index(listed_in, sep=",")
 
-    # Drop columns no longer needed immediately for dashboarding, but keep processed ones
-    df.drop(columns=["normalized_title"], inplace=True, errors="ignore")
-    # We keep 'date_added' as it might be useful for time-series components
 
-    # Handle missing values in key numeric/categorical columns for plotting
-    df["year_added"] = df["year_added"].astype("Int64")
-    df["month_added"] = df["month_added"].astype("Int64")
-    df["release_year"] = df["release_year"].astype("Int64")
+class Dataset:
+    """A consistent snapshot of the prepared frame and everything derived from it.
 
-    df["country"] = df["country"].replace("Not Given", np.nan)
-    df["director"] = df["director"].replace("Not Given", np.nan)
-    df["rating"] = df["rating"].replace("Not Given", np.nan)
+    Callbacks take one snapshot per request through current_dataset(), so a
+    reload swapping in a new version never mixes old and new data within a
+    request. Derived structures can be passed in when they were extended
+    incrementally; otherwise they are built from the frame.
+    """
 
-    return df
+    def __init__(self, df, cube=None, genre_index=None, country_index=None):
+        self.df = df
+        self.version = df.attrs["version"]
+        self.source = df.attrs.get("source", {})
+        # Row counts from the last preparation of this dataset (kept in the cache)
+        self.load_report = df.attrs.get("load_report", {})
+        # Pre-aggregated counts the page callbacks slice instead of scanning the frame
+        self.cube = cube if cube is not None else build_count_cube(df)
+        self.genre_index = genre_index if genre_index is not None else build_genre_index(df)
+        # Every co-producing country of each title, for the "all countries" chart mode
+        self.country_index = (
+            country_index
+            if country_index is not None
+            else build_multi_value_index(df["country"], sep=",")
+        )
+        # Sorted value counts behind the top-N bar charts, overall and per type
+        self.top_k = {
+            "director": build_top_k(df["director"], df["type"]),
+            "primary_country": build_top_k(df["primary_country"], df["type"]),
+            "country": build_top_k_from_index(self.country_index, df["type"]),
+        }
+        self._crossfilter = None
+        self._crossfilter_lock = threading.Lock()
+        self._search_index = None
+        self._search_lock = threading.Lock()
 
+    @property
+    def crossfilter(self):
+        """Bitmap index for the global cross-filter, built on first use.
 
-# Load data once globally for the app to use
-GLOBAL_DF = load_and_prepare_data()
+        Most sessions never enable the cross-filter, so workers only pay for
+        the bitmaps (about n_titles / 8 bytes per filter value) once one does.
+        """
+        with self._crossfilter_lock:
+            if self._crossfilter is None:
+                self._crossfilter = CrossFilterIndex(self)
+            return self._crossfilter
 
+    def top_values(self, dimension, n, crossfilter=None, mask=None):
+        """The `n` most frequent values of `dimension` among the cross-filtered titles.
 
-def get_genre_counts(df_filtered):
-    """Helper to get genre counts from a pre-filtered DataFrame."""
-    if (
-        "genres_list" not in df_filtered.columns
-        or df_filtered["genres_list"].isnull().all()
-    ):
-        return pd.DataFrame(columns=["genre", "count"])
+        With no filter, or only a single content type, this slices a sorted
+        table; otherwise the titles selected by `mask` are recounted.
+        """
+        top_k = self.top_k[dimension]
+        types = (crossfilter or {}).get("type", [])
+        if mask is None or (set(crossfilter) == {"type"} and len(types) == 1):
+            return top_k.top(n, content_type=types[0] if types else None)
+        return top_k.top(n, mask=mask)
+
+    @property
+    def search_index(self):
+        """Inverted index over titles, directors and countries, built on first search."""
+        with self._search_lock:
+            if self._search_index is None:
+                self._search_index = build_search_index(self.df)
+            return self._search_index
+
+
+_PINNED = threading.local()
 
-    all_genres = [
-        genre for sublist in df_filtered["genres_list"].dropna() for genre in sublist
-    ]
-    genre_counts = Counter(all_genres)
-    return pd.DataFrame(genre_counts.items(), columns=["genre", "count"]).sort_values(
-        by="count", ascending=False
+
+def current_dataset():
+    """The dataset snapshot to use for the rest of a request (None if loading failed)."""
+    pinned = getattr(_PINNED, "dataset", None)
+    return pinned if pinned is not None else _CURRENT_DATASET
+
+
+@contextmanager
+def pinned_dataset():
+    """Pins the current snapshot for this thread, so a swap mid-request goes unnoticed."""
+    previous = getattr(_PINNED, "dataset", None)
+    _PINNED.dataset = current_dataset()
+    try:
+        yield _PINNED.dataset
+    finally:
+        _PINNED.dataset = previous
+
+
+def swap_dataset(dataset):
+    """Atomically makes `dataset` the current snapshot.
+
+    The module-level GLOBAL_* names are refreshed too, for scripts that read
+    them as data_loader attributes; the app itself goes through current_dataset().
+    """
+    global _CURRENT_DATASET, GLOBAL_DF, GLOBAL_CUBE, GENRE_INDEX, COUNTRY_INDEX
+    global DATASET_VERSION, LOAD_REPORT
+    _CURRENT_DATASET = dataset
+    GLOBAL_DF = dataset.df if dataset else None
+    GLOBAL_CUBE = dataset.cube if dataset else None
+    GENRE_INDEX = dataset.genre_index if dataset else None
+    COUNTRY_INDEX = dataset.country_index if dataset else None
+    DATASET_VERSION = dataset.version if dataset else None
+    LOAD_REPORT = dataset.load_report if dataset else {}
+
+
+# Load data once globally for the app to use
+_initial_df = load_and_prepare_data()
+swap_dataset(Dataset(_initial_df) if _initial_df is not None else None)
+del _initial_df
+if DATASET_VERSION is not None:
+    logger.info(
+        "Dataset loaded",
+        extra={"path": DATA_PATH, "version": DATASET_VERSION, **LOAD_REPORT},
     )
 
 
+def get_genre_counts(df_filtered=None, mask=None, dataset=None):
+    """Helper to get genre counts for a row-subset of the dataset's frame or a boolean mask over it."""
+    dataset = dataset or current_dataset()
+    if dataset is None:
+        return pd.DataFrame(columns=["genre", "count"])
+    if mask is None and df_filtered is not None:
+        mask = dataset.genre_index.rows_mask(df_filtered.index)
+    genre_counts = dataset.genre_index.counts(mask)
+    return pd.DataFrame({"genre": genre_counts.index, "count": genre_counts.to_numpy()})
+
+
 if __name__ == "__main__":
     # Test the loader
     df_test = load_and_prepare_data()
@@ -112,9 +376,11 @@ if __name__ == "__main__":
                 ["title", "duration", "seasons"]
             ].head()
         )
-        print("\nGenre list example:")
-        print(df_test[["title", "listed_in", "genres_list"]].head())
         print("\nGenre counts (overall):")
         print(get_genre_counts(df_test).head())
+        print("\nLoad report:")
+        print(df_test.attrs.get("load_report"))
+        print("\nMemory per column (bytes):")
+        print(memory_report())
     else:
         print("Failed to load data.")
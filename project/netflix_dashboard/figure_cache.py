@@ -0,0 +1,223 @@
+# netflix_dashboard/figure_cache.py
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.io as pio
+
+import data_loader
+from app_logging import get_logger
+from metrics import timed_callback
+from profiling import lap
+
+# "memory" keeps a per-process LRU; "sqlite" shares entries between every
+# gunicorn worker on the host through a local database file.
+FIGURE_CACHE_BACKEND = os.environ.get("FIGURE_CACHE_BACKEND", "memory")
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", "512"))
+FIGURE_CACHE_PATH = os.environ.get(
+    "FIGURE_CACHE_PATH", os.path.join(data_loader.CACHE_DIR, "figures.sqlite")
+)
+
+logger = get_logger(__name__)
+
+
+class MemoryFigureCache:
+    """Bounded in-process LRU of serialized figures."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key, payload):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteFigureCache:
+    """Bounded LRU of serialized figures in a SQLite file shared across processes."""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS figures ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS figures_last_used ON figures (last_used)"
+            )
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute("SELECT payload FROM figures WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE figures SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        return row[0]
+
+    def set(self, key, payload):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO figures (key, payload, last_used) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM figures WHERE key IN (SELECT key FROM figures "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM figures").fetchone()[0]
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM figures")
+
+
+def _make_cache():
+    if FIGURE_CACHE_BACKEND == "sqlite":
+        try:
+            return SQLiteFigureCache(FIGURE_CACHE_PATH, FIGURE_CACHE_SIZE)
+        except sqlite3.Error as e:
+            logger.warning(
+                "SQLite figure cache unavailable; using memory", extra={"error": str(e)}
+            )
+    return MemoryFigureCache(FIGURE_CACHE_SIZE)
+
+
+FIGURE_CACHE = _make_cache()
+CACHE_STATS = {"hits": 0, "misses": 0}
+# Callbacks run on several threads of a gthread worker
+_stats_lock = threading.Lock()
+
+
+def _count(outcome):
+    with _stats_lock:
+        CACHE_STATS[outcome] += 1
+
+
+def figure_cache_key(name, args, version):
+    """Key for a callback invocation: callback name, its inputs and the dataset version."""
+    return json.dumps([name, version, args], sort_keys=True, default=str)
+
+
+def cached_payload(key):
+    """The cached figure JSON under `key`, or None; counted as a hit or a miss."""
+    payload = FIGURE_CACHE.get(key)
+    _count("hits" if payload is not None else "misses")
+    return payload
+
+
+def store_figure(key, fig):
+    FIGURE_CACHE.set(key, pio.to_json(fig, validate=False))
+
+
+def cached_figure(func):
+    """Memoizes a figure callback by its inputs and the current dataset version.
+
+    Entries for older versions are never hit again after a reload and age
+    out of the LRU.
+
+    A hit returns the cached figure as a plain dict, which Dash accepts for
+    any "figure" output, without re-running the plotly.express build. A
+    background callback is looked up in the request thread instead (see
+    background.serve_cached_figures).
+    """
+    name = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        # The key and the figure must come from the same snapshot, even if a
+        # reload swaps the dataset while the callback is running
+        with data_loader.pinned_dataset() as dataset:
+            version = dataset.version if dataset is not None else None
+            key = figure_cache_key(name, args, version)
+            payload = cached_payload(key)
+            if payload is not None:
+                figure = json.loads(payload)
+                lap("cache")
+                return figure
+
+            fig = func(*args)
+        store_figure(key, fig)
+        lap("cache")
+        return fig
+
+    def cache_key(*args):
+        """The key a call with `args` is cached under, for the current dataset."""
+        with data_loader.pinned_dataset() as dataset:
+            version = dataset.version if dataset is not None else None
+            return figure_cache_key(name, args, version)
+
+    timed = timed_callback(wrapper)
+    # For background callbacks, which look the figure up before starting a job
+    timed.cache_key = cache_key
+    # For benchmarks timing the undecorated callback rather than the cache
+    timed.uncached = func
+    return timed
+
+
+def cached_layout(func):
+    """Builds a page layout once per dataset version and serves that component tree after.
+
+    Slider bounds, dropdown options and the pre-computed series in a layout
+    depend only on the dataset, so navigation skips recomputing them. Only
+    the latest version's tree is kept; it is shared between requests and
+    must not be mutated.
+    """
+    lock = threading.Lock()
+    latest = {}
+
+    @functools.wraps(func)
+    def wrapper():
+        with data_loader.pinned_dataset() as dataset:
+            if dataset is None:  # The error layout is cheap and must not stick
+                return func()
+            with lock:
+                if latest.get("version") != dataset.version:
+                    latest["layout"] = func()
+                    latest["version"] = dataset.version
+                return latest["layout"]
+
+    # For benchmarks timing the build itself rather than the cached tree
+    wrapper.uncached = func
+    return wrapper
@@ -0,0 +1,17 @@
+# netflix_dashboard/gunicorn.conf.py
+# Picked up automatically by `gunicorn app:server` (see Procfile).
+import os
+
+
+def on_starting(server):
+    """Builds the prepared-data cache once in the master before any worker forks.
+
+    With NETFLIX_SHARED_DATA=1 the workers then only memory-map that file, so
+    resident memory stays roughly flat as the worker count grows.
+    """
+    if os.environ.get("NETFLIX_SHARED_DATA", "0") != "1":
+        return
+    from data_loader import GLOBAL_DF
+
+    if GLOBAL_DF is None:
+        server.log.warning("Shared data cache could not be built; workers will load the CSV")
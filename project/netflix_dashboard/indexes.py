@@ -0,0 +1,169 @@
+# netflix_dashboard/indexes.py
+import numpy as np
+import pandas as pd
+
+
+class MultiValueIndex:
+    """Exploded, integer-coded index over a comma-separated multi-value column.
+
+    Every (title, value) pair is stored as a row position plus a value code,
+    so counting values for any boolean filter mask over the titles is a single
+    vectorised bincount instead of a Python loop over per-title lists.
+    """
+
+    def __init__(self, rows, codes, values, n_rows):
+        self.rows = rows  # Position of the title each pair belongs to
+        self.codes = codes  # Code of the value, indexing into `values`
+        self.values = values
+        self.n_rows = n_rows
+
+    def counts(self, mask=None):
+        """Number of titles per value among the titles selected by `mask`, largest first."""
+        codes = self.codes if mask is None else self.codes[np.asarray(mask)[self.rows]]
+        counts = np.bincount(codes, minlength=len(self.values))
+        present = np.flatnonzero(counts)
+        return pd.Series(
+            counts[present], index=self.values[present], name="count"
+        ).sort_values(ascending=False, kind="stable")
+
+    def extend(self, series, sep=","):
+        """A new index covering these titles followed by the titles in `series`.
+
+        Known values keep their codes and new ones are appended, so the result
+        equals building the index over the concatenated column. `self` is left
+        untouched for readers still holding it.
+        """
+        delta = build_multi_value_index(series.reset_index(drop=True), sep=sep)
+        known = pd.Index(self.values).get_indexer(delta.values)
+        new_values = delta.values[known < 0]
+        known[known < 0] = len(self.values) + np.arange(len(new_values))
+        return MultiValueIndex(
+            rows=np.concatenate([self.rows, delta.rows + self.n_rows]),
+            codes=np.concatenate([self.codes, known[delta.codes].astype(np.int32)]),
+            values=np.concatenate([self.values, new_values]),
+            n_rows=self.n_rows + delta.n_rows,
+        )
+
+    def bitmap_index(self):
+        """Packed per-value bitmaps over the titles, for the cross-filter."""
+        return BitmapIndex(
+            self.values,
+            pack_bitmaps(self.rows, self.codes, len(self.values), self.n_rows),
+            self.n_rows,
+        )
+
+    def rows_mask(self, positions):
+        """Boolean mask over the titles from an array of row positions."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[np.asarray(positions)] = True
+        return mask
+
+
+class BitmapIndex:
+    """One packed bitmap per value of a filter dimension, over all titles.
+
+    Bit j of a value's bitmap (np.packbits order) is set when title j has
+    that value, so a selection over several dimensions is a bitwise AND of
+    per-dimension bitmaps, each an OR over the selected values, touching
+    n_titles / 8 bytes per bitmap instead of re-scanning the columns.
+
+    For an ordered dimension the bitmaps are also kept range-encoded (row i
+    covers values[0] to values[i]), so any range is answered from two bitmaps.
+    """
+
+    def __init__(self, values, bitmaps, n_rows, ordered=False):
+        self.values = values
+        self.bitmaps = bitmaps  # (len(values), ceil(n_rows / 8)) uint8
+        self.n_rows = n_rows
+        self.cumulative = (
+            np.bitwise_or.accumulate(bitmaps, axis=0) if ordered and len(values) else None
+        )
+
+    def empty(self):
+        return np.zeros(self.bitmaps.shape[1], dtype=np.uint8)
+
+    def any_of(self, values):
+        """Titles having at least one of `values`; unknown values match nothing."""
+        codes = pd.Index(self.values).get_indexer(list(values))
+        codes = codes[codes >= 0]
+        if not len(codes):
+            return self.empty()
+        return np.bitwise_or.reduce(self.bitmaps[codes], axis=0)
+
+    def between(self, low, high):
+        """Titles whose value lies in the inclusive range [low, high]; needs ordered=True."""
+        first = np.searchsorted(self.values, low, side="left")
+        last = np.searchsorted(self.values, high, side="right") - 1
+        if last < first:
+            return self.empty()
+        selected = self.cumulative[last].copy()
+        if first > 0:
+            selected &= ~self.cumulative[first - 1]
+        return selected
+
+
+def pack_bitmaps(rows, codes, n_values, n_rows):
+    """Packs (row position, value code) pairs into one bitmap per value code."""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(n_values + 1))
+    bitmaps = np.empty((n_values, (n_rows + 7) // 8), dtype=np.uint8)
+    bits = np.zeros(n_rows, dtype=bool)
+    for code in range(n_values):
+        bits[:] = False
+        bits[rows[order[bounds[code] : bounds[code + 1]]]] = True
+        bitmaps[code] = np.packbits(bits)
+    return bitmaps
+
+
+def build_bitmap_index(series, ordered=False):
+    """Builds a BitmapIndex over a single-valued column (missing values match nothing).
+
+    With ordered=True the values are sorted so ranges can be selected.
+    """
+    present = series.notna().to_numpy(dtype=bool)
+    codes, values = pd.factorize(series[present], sort=ordered)
+    values = np.asarray(values, dtype=np.float64 if ordered else object)
+    return BitmapIndex(
+        values,
+        pack_bitmaps(np.flatnonzero(present), codes, len(values), len(series)),
+        len(series),
+        ordered=ordered,
+    )
+
+
+def unpack_mask(bitmap, n_rows):
+    """Boolean mask over the titles from a packed bitmap."""
+    return np.unpackbits(bitmap, count=n_rows).view(bool)
+
+
+def build_multi_value_index(series, sep=","):
+    """Builds a MultiValueIndex from a string column, e.g. listed_in or country.
+
+    The series must have a RangeIndex so labels double as row positions.
+    """
+    exploded = series.dropna().str.split(sep).explode().str.strip()
+    exploded = exploded[exploded.notna() & (exploded != "")]
+    codes, values = pd.factorize(exploded, sort=False)
+    return MultiValueIndex(
+        rows=exploded.index.to_numpy(dtype=np.int64),
+        codes=codes.astype(np.int32),
+        values=np.asarray(values, dtype=object),
+        n_rows=len(series),
+    )
+
+
+def categorical_counts(series, mask=None):
+    """Counts per category of a categorical series among the rows selected by `mask`.
+
+    Largest first, ties kept in category order; a vectorised bincount over
+    the codes rather than a per-row pass over the strings.
+    """
+    codes = series.cat.codes.to_numpy()
+    if mask is not None:
+        codes = codes[np.asarray(mask)]
+    categories = series.cat.categories
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    present = np.flatnonzero(counts)
+    return pd.Series(
+        counts[present], index=categories[present], name="count"
+    ).sort_values(ascending=False, kind="stable")
@@ -0,0 +1,230 @@
+# netflix_dashboard/ingest.py
+"""Streaming, chunked ingestion for catalogues larger than memory.
+
+The CSV is read in fixed-size chunks. Each chunk is de-duplicated against
+every title seen so far and then prepared with the same per-row steps as
+data_loader. The result is emitted either as the aggregates the pages need
+or as a Parquet dataset partitioned by content type. Peak memory follows
+the chunk size rather than the file size; only the dedup hash set and the
+aggregate tables grow with the catalogue.
+
+    python ingest.py path/to/catalogue.csv --output aggregates
+    python ingest.py path/to/catalogue.csv --output parquet --output-dir data/prepared
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import build_count_cube, merge_count_cubes
+from preparation import STRING_DTYPE, normalize_titles, prepare_rows
+from topk import SpaceSaving
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed for Parquet output
+    pa = None
+    pq = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+DEFAULT_CHUNK_ROWS = 100_000
+# Per-(type, value) counts that --top-k approximates: (result key, column, separator)
+TOP_K_COUNTS = [
+    ("country_counts", "country", ","),
+    ("primary_country_counts", "primary_country", None),
+    ("director_counts", "director", None),
+]
+
+
+class TitleDeduplicator:
+    """Incremental keep-first dedup on normalized titles across chunks.
+
+    Titles are remembered as 64-bit hashes, so the set costs a fixed amount
+    per unique title regardless of title length.
+    """
+
+    def __init__(self):
+        self._seen = set()
+
+    def keep_mask(self, titles):
+        """Boolean mask of the titles not seen in this or any earlier chunk."""
+        hashes = pd.util.hash_pandas_object(
+            normalize_titles(titles.astype(object)), index=False
+        ).to_numpy()
+        first_in_chunk = ~pd.Series(hashes).duplicated(keep="first").to_numpy()
+        unseen = np.fromiter(
+            (h not in self._seen for h in hashes.tolist()), dtype=bool, count=len(hashes)
+        )
+        keep = first_in_chunk & unseen
+        self._seen.update(hashes[keep].tolist())
+        return keep
+
+
+def iter_prepared_chunks(file_path, chunk_rows=DEFAULT_CHUNK_ROWS, load_report=None):
+    """Yields prepared, globally de-duplicated chunks of the CSV at `file_path`.
+
+    If given, `load_report` is updated in place with the same counters that
+    data_loader records for a full load.
+    """
+    load_report = {} if load_report is None else load_report
+    for key in ("rows_read", "duplicates_dropped", "date_added_missing", "date_added_malformed"):
+        load_report.setdefault(key, 0)
+
+    dedup = TitleDeduplicator()
+    for raw in pd.read_csv(file_path, chunksize=chunk_rows):
+        keep = dedup.keep_mask(raw["title"])
+        load_report["rows_read"] += len(raw)
+        load_report["duplicates_dropped"] += int((~keep).sum())
+        chunk = prepare_rows(raw[keep].reset_index(drop=True))
+        for key, value in chunk.attrs["load_report"].items():
+            load_report[key] += value
+        yield chunk
+
+
+def value_counts_by_type(chunk, column, sep=None):
+    """Title counts per (type, value) for a column, splitting multi-value cells on `sep`."""
+    values = chunk[column].astype(object)
+    if sep is not None:
+        values = values.str.split(sep).explode().str.strip()
+    values = values[values.notna() & (values != "")]
+    return pd.DataFrame(
+        {
+            "type": chunk["type"].astype(object).loc[values.index].to_numpy(),
+            column: values.to_numpy(),
+        }
+    ).value_counts()
+
+
+def _add_counts(total, part):
+    return part if total is None else total.add(part, fill_value=0).astype(np.int64)
+
+
+def _sketch_counts(sketches, column):
+    """Per-(type, value) SpaceSaving summaries of one dimension as a single frame."""
+    frames = [
+        sketch.summary().rename_axis(column).reset_index().assign(type=content_type)
+        for content_type, sketch in sketches.items()
+    ]
+    if not frames:
+        frames = [pd.DataFrame(columns=["type", column, "estimate", "error", "lower_bound"])]
+    frame = pd.concat(frames, ignore_index=True).set_index(["type", column])
+    return frame.astype(np.int64)
+
+
+def ingest_to_aggregates(file_path, chunk_rows=DEFAULT_CHUNK_ROWS, top_k=None):
+    """Streams the CSV into the aggregates behind the dashboard pages.
+
+    Returns a dict with the CountCube, per-(type, value) counts for genres,
+    all co-producing countries, primary countries and directors, and the
+    load report. With `top_k`, the country and director counts are
+    approximate: each content type keeps `top_k` Space-Saving counters per
+    dimension (topk.SpaceSaving) instead of one count per distinct value,
+    and those entries are frames of estimate, error and lower_bound columns
+    instead of exact count Series.
+    """
+    load_report = {}
+    cube = None
+    counts = dict.fromkeys(
+        ["genre_counts", "country_counts", "primary_country_counts", "director_counts"]
+    )
+    sketches = {}
+    for chunk in iter_prepared_chunks(file_path, chunk_rows, load_report):
+        part = build_count_cube(chunk)
+        cube = part if cube is None else merge_count_cubes(cube, part)
+        counts["genre_counts"] = _add_counts(
+            counts["genre_counts"], value_counts_by_type(chunk, "listed_in", sep=",")
+        )
+        for name, column, sep in TOP_K_COUNTS:
+            part_counts = value_counts_by_type(chunk, column, sep=sep)
+            if top_k is None:
+                counts[name] = _add_counts(counts[name], part_counts)
+                continue
+            for content_type, type_counts in part_counts.groupby(level="type"):
+                sketch = sketches.setdefault(name, {}).setdefault(
+                    content_type, SpaceSaving(top_k)
+                )
+                sketch.update(type_counts.droplevel("type"))
+    if top_k is not None:
+        for name, column, _ in TOP_K_COUNTS:
+            counts[name] = _sketch_counts(sketches.get(name, {}), column)
+    return {"cube": cube, **counts, "load_report": load_report}
+
+
+def ingest_to_parquet(file_path, output_dir, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Streams the CSV into a Parquet dataset under `output_dir`, partitioned by type.
+
+    Returns the load report.
+    """
+    if pq is None:
+        raise ImportError("Parquet output requires pyarrow")
+    if os.path.isdir(output_dir) and os.listdir(output_dir):
+        raise FileExistsError(f"{output_dir} is not empty")
+
+    load_report = {}
+    for i, chunk in enumerate(iter_prepared_chunks(file_path, chunk_rows, load_report)):
+        # Category codes differ between chunks; Parquet dictionary-encodes strings anyway
+        for column in chunk.select_dtypes("category").columns:
+            chunk[column] = chunk[column].astype(STRING_DTYPE)
+        pq.write_to_dataset(
+            pa.Table.from_pandas(chunk, preserve_index=False),
+            output_dir,
+            partition_cols=["type"],
+            basename_template=f"part-{i:05d}-{{i}}.parquet",
+        )
+    return load_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", help="Catalogue CSV to ingest")
+    parser.add_argument("--output", choices=["aggregates", "parquet"], default="aggregates")
+    parser.add_argument("--output-dir", help="Dataset directory for --output parquet")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        help="Keep approximate counts of only this many countries/directors per type",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.output == "parquet":
+        if not args.output_dir:
+            parser.error("--output parquet requires --output-dir")
+        if args.top_k is not None:
+            parser.error("--top-k only applies to --output aggregates")
+        load_report = ingest_to_parquet(args.csv, args.output_dir, args.chunk_rows)
+    else:
+        result = ingest_to_aggregates(args.csv, args.chunk_rows, top_k=args.top_k)
+        load_report = result["load_report"]
+        print(f"Cube cells: {result['cube'].n_cells()}, titles: {result['cube'].total()}")
+        for name in ("genre_counts", "country_counts", "director_counts"):
+            counts = result[name].groupby(level=1).sum()
+            if isinstance(counts, pd.DataFrame):
+                print(
+                    f"\nTop {name} (approximate: the true count is between "
+                    "lower_bound and estimate):"
+                )
+                print(counts.nlargest(5, "estimate"))
+            else:
+                print(f"\nTop {name}:")
+                print(counts.nlargest(5))
+
+    print(f"\nLoad report: {load_report}")
+    finished = f"Finished in {time.perf_counter() - started:.1f}s"
+    if resource is not None:
+        # ru_maxrss is in kB on Linux
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        finished += f", peak RSS {peak_mb:.0f} MB"
+    print(finished)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# netflix_dashboard/metrics.py
+"""Per-callback response size and timing, served at /metrics in Prometheus text format.
+
+For every request to Dash's callback endpoint the app records, labelled by
+the callback's output id:
+
+- dash_callback_response_bytes: the JSON body as Dash produced it
+- dash_callback_wire_bytes: the body as sent, after any response compression
+- dash_callback_compute_seconds: time inside the callback function
+- dash_callback_serialize_seconds: the rest of the request, mostly Dash's
+  JSON serialization of the returned figure
+
+Compute time comes from callbacks wrapped with timed_callback (every
+server-side callback is; cached_figure applies it), which also feeds the
+per-phase latency summaries of profiling.py into this endpoint and
+/profile. A request that ran no timed callback, such as a background job
+poll, gets no compute or serialize observation. Metrics are kept per
+process, so under gunicorn each scrape of /metrics reports the worker
+that answered it.
+"""
+import bisect
+import functools
+import threading
+import time
+
+import flask
+
+from app_logging import get_logger
+from profiling import profile_callback, render_prometheus, report
+
+CALLBACK_PATH_SUFFIX = "/_dash-update-component"
+
+logger = get_logger(__name__)
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+METRIC_DEFINITIONS = {
+    "dash_callback_response_bytes": (
+        "Uncompressed size of the callback response body",
+        BYTES_BUCKETS,
+    ),
+    "dash_callback_wire_bytes": (
+        "Size of the callback response body as sent, after compression",
+        BYTES_BUCKETS,
+    ),
+    "dash_callback_compute_seconds": (
+        "Time spent inside the callback function",
+        SECONDS_BUCKETS,
+    ),
+    "dash_callback_serialize_seconds": (
+        "Request time outside the callback function, mostly JSON serialization",
+        SECONDS_BUCKETS,
+    ),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class CallbackMetrics:
+    """Histograms per (metric, callback), rendered as Prometheus text."""
+
+    def __init__(self, definitions=METRIC_DEFINITIONS):
+        self.definitions = definitions
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric, callback, value):
+        with self._lock:
+            histogram = self._histograms.get((metric, callback))
+            if histogram is None:
+                histogram = Histogram(self.definitions[metric][1])
+                self._histograms[(metric, callback)] = histogram
+            histogram.observe(value)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for metric, (help_text, _) in self.definitions.items():
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for (name, callback), histogram in sorted(self._histograms.items()):
+                    if name != metric:
+                        continue
+                    label = f'callback="{_escape(callback)}"'
+                    cumulative = 0
+                    bounds = [*histogram.buckets, "+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+                    lines.append(f"{metric}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = CallbackMetrics()
+
+# Compute time of the callback running in this thread's current request
+_request_state = threading.local()
+
+
+def timed_callback(func):
+    """Records how long `func` runs as the compute time of the current callback request.
+
+    The call is also profiled under the callback's name (see profiling.py).
+    """
+    name = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            with profile_callback(name):
+                return func(*args, **kwargs)
+        finally:
+            _request_state.compute = (getattr(_request_state, "compute", None) or 0.0) + (
+                time.perf_counter() - started
+            )
+
+    return wrapper
+
+
+def _is_callback_request():
+    return flask.request.path.endswith(CALLBACK_PATH_SUFFIX)
+
+
+def _callback_name():
+    body = flask.request.get_json(silent=True) or {}
+    return body.get("output", "unknown")
+
+
+def _start_timer():
+    if _is_callback_request():
+        flask.g.metrics_started = time.perf_counter()
+        _request_state.compute = None
+
+
+def _observe_response(response):
+    started = flask.g.get("metrics_started")
+    if started is None or response.direct_passthrough:
+        return response
+    callback = _callback_name()
+    compute = getattr(_request_state, "compute", None)
+    METRICS.observe("dash_callback_response_bytes", callback, len(response.get_data()))
+    if compute is None:  # No timed callback ran, so there is nothing to split
+        return response
+    METRICS.observe("dash_callback_compute_seconds", callback, compute)
+    METRICS.observe(
+        "dash_callback_serialize_seconds",
+        callback,
+        max(time.perf_counter() - started - compute, 0.0),
+    )
+    return response
+
+
+def _observe_wire_bytes(response):
+    if flask.g.get("metrics_started") is None or response.direct_passthrough:
+        return response
+    METRICS.observe("dash_callback_wire_bytes", _callback_name(), len(response.get_data()))
+    return response
+
+
+def enable_compression(server, algorithms):
+    """Compresses responses with flask-compress, e.g. algorithms=["br", "gzip"] in order of preference."""
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        logger.warning("Response compression needs flask-compress; responses stay uncompressed")
+        return False
+    server.config["COMPRESS_ALGORITHM"] = algorithms
+    Compress(server)
+    return True
+
+
+def instrument_app(app, compression=None, path="/metrics"):
+    """Adds callback metrics, optional response compression and the /metrics and /profile endpoints."""
+    server = app.server
+    server.before_request(_start_timer)
+    # Flask runs after_request hooks in reverse order of registration, so this
+    # one sees the body after compression and _observe_response sees it before
+    server.after_request(_observe_wire_bytes)
+    if compression:
+        enable_compression(server, compression)
+    server.after_request(_observe_response)
+    server.add_url_rule(
+        path,
+        "metrics",
+        lambda: flask.Response(
+            METRICS.render() + render_prometheus(), mimetype="text/plain; version=0.0.4"
+        ),
+    )
+    server.add_url_rule("/profile", "profile", lambda: flask.jsonify(report()))
@@ -2,51 +2,63 @@
 import dash_bootstrap_components as dbc
 from dash import dcc, html, callback
 from dash.dependencies import Input, Output, State
+import calendar
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 
 from data_loader import (
-    GLOBAL_DF,
+    current_dataset,
     get_genre_counts,
-)  # Use the globally loaded and prepared DataFrame
+)  # Use the globally loaded and prepared dataset snapshot
+from crossfilter import apply_crossfilter, combine_masks, toggle_value
+from aggregates import DURATION_BUCKET_WIDTH, bin_counts, box_summary, nice_bin_width
+from background import background_callback_options
+from figure_cache import cached_figure, cached_layout
+from metrics import timed_callback
+from profiling import lap
 
 MOVIE_COLOR = "#E50914"
 TV_SHOW_COLOR = "#221F1F"
 GENRE_COLOR_SCALE = px.colors.sequential.Viridis
 
 
+@cached_layout
 def layout():
-    if GLOBAL_DF is None:
+    dataset = current_dataset()
+    if dataset is None:
         return dbc.Container([html.H3("Data could not be loaded for Deep Dive Page.")])
+    df = dataset.df
 
-    all_ratings = sorted(GLOBAL_DF["rating"].dropna().unique().tolist())
+    all_ratings = sorted(df["rating"].dropna().unique().tolist())
     min_year_added = (
-        int(GLOBAL_DF["year_added"].min())
-        if pd.notna(GLOBAL_DF["year_added"].min())
+        int(df["year_added"].min())
+        if pd.notna(df["year_added"].min())
         else 2000
     )
     max_year_added = (
-        int(GLOBAL_DF["year_added"].max())
-        if pd.notna(GLOBAL_DF["year_added"].max())
+        int(df["year_added"].max())
+        if pd.notna(df["year_added"].max())
         else 2025
     )
 
     min_duration_movie = (
-        int(GLOBAL_DF["duration_min"].min())
-        if pd.notna(GLOBAL_DF["duration_min"].min())
+        int(df["duration_min"].min())
+        if pd.notna(df["duration_min"].min())
         else 0
     )
     max_duration_movie = (
-        int(GLOBAL_DF["duration_min"].max())
-        if pd.notna(GLOBAL_DF["duration_min"].max())
+        int(df["duration_min"].max())
+        if pd.notna(df["duration_min"].max())
         else 300
     )
 
     min_seasons_tv = (
-        int(GLOBAL_DF["seasons"].min()) if pd.notna(GLOBAL_DF["seasons"].min()) else 1
+        int(df["seasons"].min()) if pd.notna(df["seasons"].min()) else 1
     )
     max_seasons_tv = (
-        int(GLOBAL_DF["seasons"].max()) if pd.notna(GLOBAL_DF["seasons"].max()) else 20
+        int(df["seasons"].max()) if pd.notna(df["seasons"].max()) else 20
     )
 
     page_layout = dbc.Container(
@@ -191,7 +203,7 @@ def layout():
                                             options=[
                                                 {"label": str(year), "value": year}
                                                 for year in sorted(
-                                                    GLOBAL_DF["year_added"]
+                                                    df["year_added"]
                                                     .dropna()
                                                     .unique()
                                                     .astype(int),
@@ -267,18 +279,27 @@ def layout():
     [
         Input("genre-content-type-radio", "value"),
         Input("genre-top-n-dropdown", "value"),
+        Input("crossfilter-store", "data"),
     ],
+    **background_callback_options(),
 )
-def update_genre_analysis(content_type, top_n):
-    if GLOBAL_DF is None:
+@cached_figure
+def update_genre_analysis(content_type, top_n, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
 
-    filtered_df = GLOBAL_DF.copy()
+    _, mask = apply_crossfilter(dataset, crossfilter)
     if content_type != "All":
-        filtered_df = GLOBAL_DF[GLOBAL_DF["type"] == content_type]
+        mask = combine_masks(
+            mask,
+            (dataset.df["type"] == content_type).to_numpy(dtype=bool, na_value=False),
+        )
 
-    genre_counts_df = get_genre_counts(filtered_df).head(top_n)
+    lap("filter")
+    genre_counts_df = get_genre_counts(mask=mask, dataset=dataset).head(top_n)
 
+    lap("aggregate")
     fig = px.bar(
         genre_counts_df.sort_values(by="count", ascending=True),
         x="count",
@@ -292,49 +313,101 @@ def update_genre_analysis(content_type, top_n):
     )
     fig.update_layout(title_x=0.5, yaxis_title="Genre", xaxis_title="Number of Titles")
     fig.update_traces(textposition="outside")
+    lap("figure")
     return fig
 
 
 # Movie Duration Histogram
 @callback(
-    Output("movie-duration-hist", "figure"), Input("movie-duration-slider", "value")
+    Output("movie-duration-hist", "figure"),
+    Input("movie-duration-slider", "value"),
+    Input("crossfilter-store", "data"),
 )
-def update_movie_duration_hist(duration_range):
-    if GLOBAL_DF is None:
+@cached_figure
+def update_movie_duration_hist(duration_range, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
     min_dur, max_dur = duration_range
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
+
+    # Per-minute movie counts from the cube: the figure carries bin totals and
+    # box statistics, so its size does not grow with the number of movies
+    duration_counts = cube.query(
+        "duration_bucket",
+        where={"type": "Movie", "duration_bucket": (min_dur, max_dur)},
+    )
+    durations = duration_counts.index.to_numpy(dtype=float)
+    counts = duration_counts.to_numpy()
+
+    lap("aggregate")
+    fig = go.Figure()
+    if counts.sum() > 0:
+        width = nice_bin_width(durations, counts, min_width=DURATION_BUCKET_WIDTH)
+        edges, totals = bin_counts(durations, counts, width)
+        fig.add_trace(
+            go.Bar(
+                x=edges + width / 2,
+                y=totals,
+                width=width,
+                marker_color=MOVIE_COLOR,
+                customdata=np.column_stack([edges, edges + width - 1]),
+                hovertemplate="Duration (minutes)=%{customdata[0]}-%{customdata[1]}"
+                "<br>count=%{y}<extra></extra>",
+                showlegend=False,
+            )
+        )
+        stats = box_summary(durations, counts)
+        fig.add_trace(
+            go.Box(
+                **{key: [value] for key, value in stats.items()},
+                y=["Duration"],
+                orientation="h",
+                boxpoints=False,
+                marker_color=MOVIE_COLOR,
+                xaxis="x2",
+                yaxis="y2",
+                showlegend=False,
+            )
+        )
 
-    movies_df = GLOBAL_DF[
-        (GLOBAL_DF["type"] == "Movie")
-        & (GLOBAL_DF["duration_min"] >= min_dur)
-        & (GLOBAL_DF["duration_min"] <= max_dur)
-    ].copy()
-
-    fig = px.histogram(
-        movies_df,
-        x="duration_min",
+    # Same arrangement as px.histogram(..., marginal="box")
+    fig.update_layout(
         title="Distribution of Movie Durations",
-        labels={"duration_min": "Duration (minutes)"},
-        marginal="box",
-        color_discrete_sequence=[MOVIE_COLOR],
+        title_x=0.5,
+        bargap=0,
+        xaxis=dict(title="Duration (minutes)", anchor="y", domain=[0.0, 1.0]),
+        yaxis=dict(title="Number of Movies", anchor="x", domain=[0.0, 0.8316]),
+        xaxis2=dict(anchor="y2", domain=[0.0, 1.0], matches="x", showticklabels=False),
+        yaxis2=dict(
+            anchor="x2", domain=[0.8416, 1.0], showticklabels=False, showline=False
+        ),
     )
-    fig.update_layout(title_x=0.5, yaxis_title="Number of Movies")
+    lap("figure")
     return fig
 
 
 # TV Show Season Bar Chart
-@callback(Output("tv-season-bar", "figure"), Input("tv-season-slider", "value"))
-def update_tv_season_bar(max_seasons):
-    if GLOBAL_DF is None:
+@callback(
+    Output("tv-season-bar", "figure"),
+    Input("tv-season-slider", "value"),
+    Input("crossfilter-store", "data"),
+)
+@cached_figure
+def update_tv_season_bar(max_seasons, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
 
-    tv_show_df = GLOBAL_DF[
-        (GLOBAL_DF["type"] == "TV Show") & (GLOBAL_DF["seasons"] <= max_seasons)
-    ].copy()
-    season_counts = tv_show_df["seasons"].value_counts().reset_index()
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
+    season_counts = cube.query(
+        "seasons", where={"type": "TV Show", "seasons": (None, max_seasons)}
+    ).reset_index()
     season_counts.columns = ["seasons", "count"]
-    season_counts = season_counts.sort_values("seasons")
 
+    lap("aggregate")
     fig = px.bar(
         season_counts,
         x="seasons",
@@ -346,6 +419,7 @@ def update_tv_season_bar(max_seasons):
     )
     fig.update_layout(title_x=0.5, xaxis=dict(tickmode="linear", dtick=1))
     fig.update_traces(textposition="outside")
+    lap("figure")
     return fig
 
 
@@ -355,25 +429,25 @@ def update_tv_season_bar(max_seasons):
     [
         Input("monthly-year-dropdown", "value"),
         Input("monthly-content-type-radio", "value"),
+        Input("crossfilter-store", "data"),
     ],
 )
-def update_monthly_additions_line(selected_year, content_type):
-    if GLOBAL_DF is None:
+@cached_figure
+def update_monthly_additions_line(selected_year, content_type, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
 
-    df_year_filtered = GLOBAL_DF[GLOBAL_DF["year_added"] == selected_year]
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
 
     if content_type != "Both":
-        df_type_filtered = df_year_filtered[
-            df_year_filtered["type"] == content_type
-        ].copy()
-        monthly_counts = (
-            df_type_filtered.groupby(["month_name_added", "month_added"])
-            .size()
-            .reset_index(name="count")
-        )
-        monthly_counts = monthly_counts.sort_values("month_added")
+        monthly_counts = cube.query(
+            "month_added", where={"year_added": selected_year, "type": content_type}
+        ).reset_index()
+        monthly_counts["month_name_added"] = _month_names(monthly_counts)
 
+        lap("aggregate")
         fig = px.line(
             monthly_counts,
             x="month_name_added",
@@ -387,12 +461,15 @@ def update_monthly_additions_line(selected_year, content_type):
         )
     else:
         monthly_counts_unstacked = (
-            df_year_filtered.groupby(["month_name_added", "month_added", "type"])
-            .size()
+            cube.query(
+                ["month_added", "type"], where={"year_added": selected_year}
+            )
             .unstack(fill_value=0)
             .reset_index()
         )
-        monthly_counts_unstacked = monthly_counts_unstacked.sort_values("month_added")
+        monthly_counts_unstacked["month_name_added"] = _month_names(
+            monthly_counts_unstacked
+        )
 
         # Ensure both Movie and TV Show columns exist
         if "Movie" not in monthly_counts_unstacked:
@@ -400,6 +477,7 @@ def update_monthly_additions_line(selected_year, content_type):
         if "TV Show" not in monthly_counts_unstacked:
             monthly_counts_unstacked["TV Show"] = 0
 
+        lap("aggregate")
         fig = px.line(
             monthly_counts_unstacked,
             x="month_name_added",
@@ -415,26 +493,38 @@ def update_monthly_additions_line(selected_year, content_type):
         )
 
     fig.update_layout(title_x=0.5, legend_title_text="Content Type")
+    lap("figure")
     return fig
 
 
+def _month_names(monthly_counts):
+    """Full month names for a frame indexed by the numeric month_added column."""
+    return monthly_counts["month_added"].map(lambda m: calendar.month_name[int(m)])
+
+
 # Rating Distribution Bar Chart
 @callback(
     Output("rating-distribution-bar", "figure"),
     Input("rating-filter-checklist", "value"),
+    Input("crossfilter-store", "data"),
 )
-def update_rating_distribution_bar(selected_ratings):
-    if GLOBAL_DF is None:
+@cached_figure
+def update_rating_distribution_bar(selected_ratings, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
 
-    if not selected_ratings:  # Handle case where no ratings are selected
-        filtered_df = pd.DataFrame(columns=["rating", "count"])
-    else:
-        filtered_df = GLOBAL_DF[GLOBAL_DF["rating"].isin(selected_ratings)]
-
-    rating_counts = filtered_df["rating"].value_counts().reset_index()
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
+    # An empty selection matches no cube cells, giving an empty chart
+    rating_counts = (
+        cube.query("rating", where={"rating": list(selected_ratings or [])})
+        .sort_values(ascending=False)
+        .reset_index()
+    )
     rating_counts.columns = ["rating", "count"]
 
+    lap("aggregate")
     fig = px.bar(
         rating_counts,
         x="rating",
@@ -447,4 +537,30 @@ def update_rating_distribution_bar(selected_ratings):
     )
     fig.update_layout(title_x=0.5, xaxis={"categoryorder": "total descending"})
     fig.update_traces(textposition="outside")
+    lap("figure")
     return fig
+
+
+# Clicking a genre or rating bar adds it to (or removes it from) the cross-filter
+@callback(
+    Output("crossfilter-genre", "value", allow_duplicate=True),
+    Output("crossfilter-enabled", "value", allow_duplicate=True),
+    Input("genre-analysis-bar", "clickData"),
+    State("crossfilter-genre", "value"),
+    prevent_initial_call=True,
+)
+@timed_callback
+def toggle_genre_from_bar(click_data, genres):
+    return toggle_value(genres, click_data["points"][0]["y"]), True
+
+
+@callback(
+    Output("crossfilter-rating", "value", allow_duplicate=True),
+    Output("crossfilter-enabled", "value", allow_duplicate=True),
+    Input("rating-distribution-bar", "clickData"),
+    State("crossfilter-rating", "value"),
+    prevent_initial_call=True,
+)
+@timed_callback
+def toggle_rating_from_bar(click_data, ratings):
+    return toggle_value(ratings, click_data["points"][0]["x"]), True
@@ -1,10 +1,17 @@
 import dash_bootstrap_components as dbc
-from dash import dcc, html, callback
-from dash.dependencies import Input, Output
+from dash import ctx, dcc, html, callback, clientside_callback, no_update
+from dash.dependencies import ClientsideFunction, Input, Output, State
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 
-from data_loader import GLOBAL_DF
+from data_loader import current_dataset
+from crossfilter import apply_crossfilter, toggle_value
+from background import background_callback_options
+from figure_cache import cached_figure, cached_layout
+from metrics import timed_callback
+from profiling import lap
 
 
 MOVIE_COLOR = "#E50914"
@@ -13,23 +20,26 @@ PRIMARY_COLOR_SCALE = px.colors.sequential.Reds
 SECONDARY_COLOR_SCALE = px.colors.sequential.Blues
 
 
+@cached_layout
 def layout():
-    if GLOBAL_DF is None:
+    dataset = current_dataset()
+    if dataset is None:
         return dbc.Container([html.H3("Data could not be loaded for Overview Page.")])
+    df = dataset.df
 
     min_year_added = (
-        int(GLOBAL_DF["year_added"].min())
-        if pd.notna(GLOBAL_DF["year_added"].min())
+        int(df["year_added"].min())
+        if pd.notna(df["year_added"].min())
         else 2000
     )
     max_year_added = (
-        int(GLOBAL_DF["year_added"].max())
-        if pd.notna(GLOBAL_DF["year_added"].max())
+        int(df["year_added"].max())
+        if pd.notna(df["year_added"].max())
         else 2025
     )
 
     unique_release_years = sorted(
-        GLOBAL_DF["release_year"].dropna().unique().astype(int)
+        df["release_year"].dropna().unique().astype(int)
     )
     min_release_year = unique_release_years[0] if unique_release_years else 1920
     max_release_year = unique_release_years[-1] if unique_release_years else 2025
@@ -66,6 +76,17 @@ def layout():
                                 marks={i: str(i) for i in range(3, 16, 2)},
                             ),
                             html.Br(),
+                            dbc.Label("Count Countries By:"),
+                            dcc.RadioItems(
+                                id="country-mode-radio",
+                                options=[
+                                    {"label": "First listed", "value": "primary"},
+                                    {"label": "All co-producing", "value": "all"},
+                                ],
+                                value="primary",
+                                inline=True,
+                                labelStyle={"margin-right": "10px"},
+                            ),
                             dcc.Graph(id="top-countries-bar"),
                         ],
                         width=12,
@@ -114,6 +135,12 @@ def layout():
                             ),
                             html.Br(),
                             dcc.Graph(id="content-release-year-line"),
+                            dcc.Store(
+                                id="release-year-series-store",
+                                data=year_series_store_data(
+                                    content_release_line_figure(dataset)
+                                ),
+                            ),
                         ],
                         width=12,
                         lg=6,
@@ -150,6 +177,12 @@ def layout():
                                 tooltip={"placement": "bottom", "always_visible": True},
                             ),
                             dcc.Graph(id="content-types-added-trend-area"),
+                            dcc.Store(
+                                id="year-added-series-store",
+                                data=year_series_store_data(
+                                    content_types_added_trend_figure(dataset)
+                                ),
+                            ),
                         ],
                         width=12,
                         className="mb-4",
@@ -167,14 +200,19 @@ def layout():
 
 # Content Type Pie Chart
 @callback(
-    Output("content-type-pie", "figure"), Input("url", "pathname")
-)  # Trigger on page load
-def update_content_type_pie(
-    _,
-):  # Input can be dummy if no specific filter from this page
-    if GLOBAL_DF is None:
+    Output("content-type-pie", "figure"),
+    Input("url", "pathname"),  # Trigger on page load
+    Input("crossfilter-store", "data"),
+)
+@cached_figure
+def update_content_type_pie(_, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
-    content_counts = GLOBAL_DF["type"].value_counts()
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
+    content_counts = cube.query("type").sort_values(ascending=False)
+    lap("aggregate")
     fig = px.pie(
         names=content_counts.index,
         values=content_counts.values,
@@ -184,41 +222,69 @@ def update_content_type_pie(
     )
     fig.update_traces(textposition="inside", textinfo="percent+label")
     fig.update_layout(title_x=0.5, legend_title_text="Content Type")
+    lap("figure")
     return fig
 
 
 # Top N Countries Bar Chart
-@callback(Output("top-countries-bar", "figure"), Input("top-n-slider", "value"))
-def update_top_countries_bar(top_n):
-    if GLOBAL_DF is None:
+@callback(
+    Output("top-countries-bar", "figure"),
+    [
+        Input("top-n-slider", "value"),
+        Input("country-mode-radio", "value"),
+        Input("crossfilter-store", "data"),
+    ],
+    **background_callback_options(),
+)
+@cached_figure
+def update_top_countries_bar(top_n, country_mode="primary", crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
-    # Simplified: considers the first country listed
-    country_counts = (
-        GLOBAL_DF["country"]
-        .dropna()
-        .apply(lambda x: x.split(",")[0].strip())
-        .value_counts()
-        .head(top_n)
-    )
+    _, mask = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
+    if country_mode == "all":
+        # Every co-producing country of a title gets one count
+        country_counts = dataset.top_values("country", top_n, crossfilter, mask)
+        title = f"Top {top_n} Countries Producing Content (incl. Co-productions)"
+    else:
+        country_counts = dataset.top_values("primary_country", top_n, crossfilter, mask)
+        title = f"Top {top_n} Countries Producing Content"
+    lap("aggregate")
+    if country_counts.empty:
+        return px.scatter(title=f"{title}: no titles match the cross-filter")
     fig = px.bar(
         x=country_counts.index,
         y=country_counts.values,
-        title=f"Top {top_n} Countries Producing Content",
+        title=title,
         labels={"x": "Country", "y": "Number of Titles"},
         text_auto=True,
         color_discrete_sequence=[SECONDARY_COLOR_SCALE[5]],  # A blue shade
     )
     fig.update_layout(title_x=0.5, xaxis_tickangle=-30)
     fig.update_traces(textposition="outside")
+    lap("figure")
     return fig
 
 
 # Top N Directors Bar Chart
-@callback(Output("top-directors-bar", "figure"), Input("top-n-slider", "value"))
-def update_top_directors_bar(top_n):
-    if GLOBAL_DF is None:
+@callback(
+    Output("top-directors-bar", "figure"),
+    Input("top-n-slider", "value"),
+    Input("crossfilter-store", "data"),
+    **background_callback_options(),
+)
+@cached_figure
+def update_top_directors_bar(top_n, crossfilter=None):
+    dataset = current_dataset()
+    if dataset is None:
         return px.scatter(title="Data not loaded")
-    directors_count = GLOBAL_DF["director"].dropna().value_counts().head(top_n)
+    _, mask = apply_crossfilter(dataset, crossfilter)
+    lap("filter")
+    directors_count = dataset.top_values("director", top_n, crossfilter, mask)
+    lap("aggregate")
+    if directors_count.empty:
+        return px.scatter(title="No titles match the cross-filter")
     fig = px.bar(
         x=directors_count.index,
         y=directors_count.values,
@@ -229,22 +295,17 @@ def update_top_directors_bar(top_n):
     )
     fig.update_layout(title_x=0.5, xaxis_tickangle=-45)
     fig.update_traces(textposition="outside")
+    lap("figure")
     return fig
 
 
 # Content Release Over Years Line Chart
-@callback(
-    Output("content-release-year-line", "figure"), Input("release-year-slider", "value")
-)
-def update_content_release_line(year_range):
-    if GLOBAL_DF is None:
-        return px.scatter(title="Data not loaded")
-    min_year, max_year = year_range
-    filtered_df = GLOBAL_DF[
-        (GLOBAL_DF["release_year"] >= min_year)
-        & (GLOBAL_DF["release_year"] <= max_year)
-    ]
-    released_year_counts = filtered_df["release_year"].value_counts().sort_index()
+def content_release_line_figure(dataset, crossfilter=None):
+    """Release-year trend over every release year; the slider range is applied client-side."""
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    released_year_counts = cube.query("release_year")
+    if released_year_counts.empty:
+        return go.Figure(layout_title_text="No titles match the cross-filter")
     fig = px.line(
         x=released_year_counts.index,
         y=released_year_counts.values,
@@ -258,25 +319,13 @@ def update_content_release_line(year_range):
 
 
 # Trend of Content Types Added to Netflix (Area Chart)
-@callback(
-    Output("content-types-added-trend-area", "figure"),
-    Input("year-added-slider-overview", "value"),
-)
-def update_content_types_added_trend(year_range):
-    if GLOBAL_DF is None:
-        return px.scatter(title="Data not loaded")
-    min_year, max_year = year_range
-
-    df_filtered = GLOBAL_DF[
-        (GLOBAL_DF["year_added"] >= min_year) & (GLOBAL_DF["year_added"] <= max_year)
-    ]
-
-    type_trend = (
-        df_filtered.groupby(["year_added", "type"])
-        .size()
-        .unstack(fill_value=0)
-        .reset_index()
-    )
+def content_types_added_trend_figure(dataset, crossfilter=None):
+    """Types-added trend over every year added; the slider range is applied client-side."""
+    cube, _ = apply_crossfilter(dataset, crossfilter)
+    type_counts = cube.query(["year_added", "type"])
+    if type_counts.empty:
+        return go.Figure(layout_title_text="No titles match the cross-filter")
+    type_trend = type_counts.unstack(fill_value=0).reset_index()
 
     if "Movie" not in type_trend.columns:
         type_trend["Movie"] = 0
@@ -297,3 +346,82 @@ def update_content_types_added_trend(year_range):
     )
     fig.update_layout(title_x=0.5, legend_title_text="Content Type")
     return fig
+
+
+def year_series_store_data(fig):
+    """Splits a per-year figure into its styling and plain per-year arrays.
+
+    The browser keeps this in a dcc.Store and rebuilds the figure for each
+    slider range in assets/overview_clientside.js, without a server round trip.
+    """
+    traces = []
+    y_values = []
+    for trace in fig.data:
+        trace_json = trace.to_plotly_json()
+        trace_json.pop("x", None)
+        y_values.append(np.asarray(trace_json.pop("y")).tolist())
+        traces.append(trace_json)
+    return {
+        "x": np.asarray(fig.data[0].x).tolist() if fig.data else [],
+        "y": y_values,
+        "traces": traces,
+        "layout": fig.to_plotly_json()["layout"],
+    }
+
+
+# Both year-range charts only re-slice tiny per-year series, so they are filtered in the browser
+clientside_callback(
+    ClientsideFunction(namespace="overview", function_name="filterYearRange"),
+    Output("content-release-year-line", "figure"),
+    Input("release-year-slider", "value"),
+    Input("release-year-series-store", "data"),
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="overview", function_name="filterYearRange"),
+    Output("content-types-added-trend-area", "figure"),
+    Input("year-added-slider-overview", "value"),
+    Input("year-added-series-store", "data"),
+)
+
+
+# The year series are built into the layout unfiltered; refresh them when a
+# cross-filter applies, and restore them when it is cleared
+@callback(
+    Output("release-year-series-store", "data"),
+    Output("year-added-series-store", "data"),
+    Input("crossfilter-store", "data"),
+)
+@timed_callback
+def update_year_series_stores(crossfilter):
+    dataset = current_dataset()
+    if dataset is None or (not crossfilter and ctx.triggered_id is None):
+        return no_update, no_update
+    return (
+        year_series_store_data(content_release_line_figure(dataset, crossfilter)),
+        year_series_store_data(content_types_added_trend_figure(dataset, crossfilter)),
+    )
+
+
+# Clicking a pie slice or a country bar narrows the cross-filter to it
+@callback(
+    Output("crossfilter-type", "value", allow_duplicate=True),
+    Output("crossfilter-enabled", "value", allow_duplicate=True),
+    Input("content-type-pie", "clickData"),
+    prevent_initial_call=True,
+)
+@timed_callback
+def select_type_from_pie(click_data):
+    return click_data["points"][0]["label"], True
+
+
+@callback(
+    Output("crossfilter-country", "value", allow_duplicate=True),
+    Output("crossfilter-enabled", "value", allow_duplicate=True),
+    Input("top-countries-bar", "clickData"),
+    State("crossfilter-country", "value"),
+    prevent_initial_call=True,
+)
+@timed_callback
+def toggle_country_from_bar(click_data, countries):
+    return toggle_value(countries, click_data["points"][0]["x"]), True
@@ -0,0 +1,121 @@
+import dash_bootstrap_components as dbc
+from dash import dcc, html, callback
+from dash.dependencies import Input, Output, State
+
+from data_loader import current_dataset
+from figure_cache import cached_layout
+from metrics import timed_callback
+from profiling import lap
+
+RESULT_LIMIT = 25
+RESULT_COLUMNS = {
+    "title": "Title",
+    "type": "Type",
+    "director": "Director",
+    "country": "Country",
+    "release_year": "Released",
+    "rating": "Rating",
+}
+
+
+@cached_layout
+def layout():
+    if current_dataset() is None:
+        return dbc.Container([html.H3("Data could not be loaded for Search Page.")])
+
+    return dbc.Container(
+        [
+            dbc.Row(
+                dbc.Col(html.H2("Search the Catalogue", className="text-center mb-4"), width=12)
+            ),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        # No debounce: results follow every keystroke
+                        dcc.Input(
+                            id="search-query",
+                            type="search",
+                            value="",
+                            placeholder="Title, director or country, e.g. \"star wa\" or \"scorsese\"",
+                            className="form-control",
+                            autoFocus=True,
+                        ),
+                        width=12,
+                        lg=8,
+                    ),
+                    dbc.Col(
+                        dbc.Button(
+                            "Filter charts to these results",
+                            id="search-apply",
+                            color="primary",
+                            disabled=True,
+                        ),
+                        width=12,
+                        lg=4,
+                    ),
+                ],
+                className="mb-2",
+                align="center",
+            ),
+            dbc.Row(
+                dbc.Col(html.Small(id="search-summary", className="text-muted"), width=12),
+                className="mb-3",
+            ),
+            dbc.Row(dbc.Col(html.Div(id="search-results"), width=12)),
+        ],
+        fluid=True,
+    )
+
+
+@callback(
+    Output("search-results", "children"),
+    Output("search-summary", "children"),
+    Output("search-apply", "disabled"),
+    Input("search-query", "value"),
+)
+@timed_callback
+def update_search_results(query):
+    dataset = current_dataset()
+    if dataset is None or not (query or "").strip():
+        return None, "Type to search titles, directors and countries", True
+    index = dataset.search_index
+    rows, _ = index.search(query, limit=RESULT_LIMIT)
+    n_matches = len(index.matches(query))
+    lap("filter")
+    if not n_matches:
+        return None, f"No titles match \"{query.strip()}\"", True
+
+    results = dataset.df.iloc[rows][list(RESULT_COLUMNS)]
+    table = dbc.Table(
+        [
+            html.Thead(html.Tr([html.Th(label) for label in RESULT_COLUMNS.values()])),
+            html.Tbody(
+                [
+                    html.Tr([html.Td("" if value is None else str(value)) for value in row])
+                    for row in results.astype(object)
+                    .where(results.notna(), None)
+                    .itertuples(index=False)
+                ]
+            ),
+        ],
+        striped=True,
+        hover=True,
+        size="sm",
+    )
+    lap("figure")
+    shown = min(n_matches, RESULT_LIMIT)
+    return table, f"{n_matches:,} titles match; showing the best {shown}", False
+
+
+# Applying a search narrows every chart to its matches and shows them on the overview
+@callback(
+    Output("crossfilter-search", "value", allow_duplicate=True),
+    Output("crossfilter-enabled", "value", allow_duplicate=True),
+    Output("url", "pathname"),
+    Input("search-apply", "n_clicks"),
+    State("search-query", "value"),
+    prevent_initial_call=True,
+)
+@timed_callback
+def apply_search_to_charts(n_clicks, query):
+    return (query or "").strip(), True, "/overview"
@@ -0,0 +1,244 @@
+# netflix_dashboard/preparation.py
+# Cleaning and feature-engineering steps for the raw Netflix catalogue. This
+# module has no import-time side effects, so worker processes and the
+# chunked ingestion CLI can use it without loading the dashboard's dataset.
+import calendar
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app_logging import ROOT_LOGGER
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow-backed strings are optional
+    pa = None
+
+# A plain logger, so importing this module does not start the log listener
+logger = logging.getLogger(f"{ROOT_LOGGER}.preparation")
+
+# Declared in-memory dtypes of the prepared frame. Low-cardinality strings are
+# categoricals, free text is Arrow-backed, and integers use the smallest
+# nullable type that holds their range.
+STRING_DTYPE = "string[pyarrow]" if pa is not None else "string"
+SCHEMA = {
+    "source_row_hash": "uint64",
+    "show_id": "int32",
+    "type": "category",
+    "title": STRING_DTYPE,
+    "director": "category",
+    "country": "category",
+    "primary_country": "category",
+    "release_year": "Int16",
+    "rating": "category",
+    "duration": STRING_DTYPE,
+    "listed_in": STRING_DTYPE,
+    "year_added": "Int16",
+    "month_added": "Int8",
+    "month_name_added": "category",
+    "duration_min": "Int16",
+    "seasons": "Int8",
+}
+
+
+def apply_schema(df):
+    """Casts the prepared frame's columns to the dtypes declared in SCHEMA."""
+    for column, dtype in SCHEMA.items():
+        if column not in df.columns:
+            continue
+        if dtype == "category":
+            # Categories in order of first appearance, so count ties keep the
+            # same order as value_counts on the original strings
+            values = df[column]
+            df[column] = pd.Categorical(values, categories=values.dropna().unique())
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+# Worker processes for prepare_data's per-row steps; 1 prepares in-process
+PREPARE_WORKERS = int(os.environ.get("NETFLIX_PREPARE_WORKERS", "1"))
+# Row partitions smaller than this are not worth shipping to another process
+MIN_PARTITION_ROWS = 50_000
+
+# Full month names by month number, for 'month_name_added'
+MONTH_NAMES = {month: calendar.month_name[month] for month in range(1, 13)}
+
+# Formats seen in Netflix catalogue exports for 'date_added', tried in order
+DATE_FORMATS = ["%m/%d/%Y", "%B %d, %Y", "%Y-%m-%d"]
+
+
+def parse_dates(values, formats=DATE_FORMATS):
+    """Parses a date string column with explicit formats, once per unique string.
+
+    Returns (datetimes, n_malformed), where n_malformed counts the non-empty
+    rows that matched none of the formats and so became NaT.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object).str.strip()
+    parsed = None
+    for fmt in formats:
+        attempt = pd.to_datetime(uniques, format=fmt, errors="coerce")
+        parsed = attempt if parsed is None else parsed.fillna(attempt)
+        if not parsed.isna().any():
+            break
+    if parsed is None or len(parsed) == 0:
+        return pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]"), 0
+
+    malformed = np.bincount(codes[codes >= 0], minlength=len(uniques))[
+        parsed.isna().to_numpy()
+    ].sum()
+    # Missing strings (code -1) pick up the trailing NaT
+    lookup = np.append(parsed.to_numpy(), np.datetime64("NaT"))
+    return pd.Series(lookup[codes], index=values.index), int(malformed)
+
+
+def normalize_titles(titles):
+    """Lower-cased, stripped titles, the key used for deduplication."""
+    return titles.str.lower().str.strip()
+
+
+def raw_row_hashes(df):
+    """64-bit hash of every raw CSV row, over all of its columns."""
+    raw_columns = [c for c in df.columns if c != "source_row_hash"]
+    return pd.util.hash_pandas_object(df[raw_columns], index=False).to_numpy()
+
+
+def prepare_rows(df, typed=True):
+    """Applies the per-row cleaning and feature-engineering steps.
+
+    Every step here only looks at its own row, so it gives the same result
+    on the whole frame, on streamed chunks or on row partitions. Missing and
+    malformed date counts are recorded in df.attrs["load_report"].
+    """
+    load_report = {}
+    # Hash of the raw row, so a reload can tell unchanged rows from edited ones
+    df["source_row_hash"] = raw_row_hashes(df)
+
+    # Convert 'date_added' to datetime objects
+    df["date_added"], malformed_dates = parse_dates(df["date_added"])
+    load_report["date_added_missing"] = int(df["date_added"].isna().sum()) - malformed_dates
+    load_report["date_added_malformed"] = malformed_dates
+
+    if "show_id" in df.columns:
+        df["show_id"] = df["show_id"].str.replace("s", "", regex=False).astype(int)
+
+    # Extract year and month from 'date_added'
+    df["year_added"] = df["date_added"].dt.year
+    df["month_added"] = df["date_added"].dt.month
+    # Full month name; a lookup instead of formatting every timestamp
+    df["month_name_added"] = df["month_added"].map(MONTH_NAMES)
+
+    # Clean duration for Movies
+    movie_mask = df["type"] == "Movie"
+    if "duration" in df.columns:
+        df.loc[movie_mask, "duration_min"] = pd.to_numeric(
+            df.loc[movie_mask, "duration"].str.replace(" min", "", regex=False),
+            errors="coerce",
+        )
+
+        # Clean duration for TV Shows (number of seasons)
+        tv_show_mask = df["type"] == "TV Show"
+        df.loc[tv_show_mask, "seasons"] = pd.to_numeric(
+            df.loc[tv_show_mask, "duration"].str.split(" ").str[0], errors="coerce"
+        )
+        df["seasons"] = df["seasons"].astype("Int64")  # Use nullable integer type
+
+    # We keep 'date_added' as it might be useful for time-series components
+
+    # Handle missing values in key numeric/categorical columns for plotting
+    df["year_added"] = df["year_added"].astype("Int64")
+    df["month_added"] = df["month_added"].astype("Int64")
+    df["release_year"] = df["release_year"].astype("Int64")
+
+    df["country"] = df["country"].replace("Not Given", np.nan)
+    # First listed country, parsed once for the top-countries chart
+    df["primary_country"] = df["country"].str.split(",", n=1).str[0].str.strip()
+    df["director"] = df["director"].replace("Not Given", np.nan)
+    df["rating"] = df["rating"].replace("Not Given", np.nan)
+
+    if typed:
+        df = apply_schema(df)
+    df.attrs["load_report"] = load_report
+    return df
+
+
+def _prepare_partition(df):
+    df = prepare_rows(df, typed=False)
+    return df, df.attrs["load_report"]
+
+
+def prepare_rows_parallel(df, workers=PREPARE_WORKERS):
+    """prepare_rows over contiguous row partitions in a pool of worker processes.
+
+    Partitions are prepared untyped and the schema is applied once to the
+    merged frame, so categories keep their global first-appearance order and
+    the result equals prepare_rows(df). Falls back to prepare_rows when the
+    frame is too small to split.
+    """
+    n_partitions = min(workers, len(df) // MIN_PARTITION_ROWS)
+    if n_partitions < 2:
+        return prepare_rows(df)
+
+    bounds = np.linspace(0, len(df), n_partitions + 1, dtype=int)
+    partitions = [df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+    with ProcessPoolExecutor(max_workers=n_partitions) as pool:
+        results = list(pool.map(_prepare_partition, partitions))
+
+    df = apply_schema(pd.concat([part for part, _ in results]))
+    df.attrs["load_report"] = {
+        key: sum(report[key] for _, report in results) for key in results[0][1]
+    }
+    return df
+
+
+def append_prepared(df, delta):
+    """Concatenates prepared frames, keeping categoricals in first-appearance order.
+
+    The result has a fresh RangeIndex, so labels stay row positions.
+    """
+    df, delta = df.copy(deep=False), delta.copy(deep=False)
+    for column in df.select_dtypes("category").columns:
+        if column not in delta.columns:
+            continue
+        categories = df[column].cat.categories
+        categories = categories.append(
+            pd.Index(delta[column].dropna().unique()).difference(categories, sort=False)
+        )
+        df[column] = df[column].cat.set_categories(categories)
+        delta[column] = pd.Categorical(delta[column], categories=categories)
+    return pd.concat([df, delta], ignore_index=True)
+
+
+def prepare_data(df, typed=True, workers=PREPARE_WORKERS):
+    """Applies the cleaning and feature-engineering steps to the raw Netflix frame.
+
+    Deduplication looks at every row, so it always runs here; with
+    workers > 1 the per-row steps after it run in a process pool.
+    """
+    rows_read = len(df)
+
+    # Deduplicate on the normalized title before the per-row work
+    df = df[~normalize_titles(df["title"]).duplicated(keep="first")]
+    # Index labels double as row positions for the genre index
+    df = df.reset_index(drop=True)
+
+    if typed and workers > 1:
+        df = prepare_rows_parallel(df, workers)
+    else:
+        df = prepare_rows(df, typed=typed)
+    load_report = {
+        "rows_read": rows_read,
+        "duplicates_dropped": rows_read - len(df),
+        **df.attrs["load_report"],
+    }
+    if load_report["date_added_malformed"]:
+        logger.warning(
+            "'date_added' values matched no known date format",
+            extra={"count": load_report["date_added_malformed"]},
+        )
+    df.attrs["load_report"] = load_report
+    return df
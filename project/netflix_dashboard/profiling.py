@@ -0,0 +1,213 @@
+# netflix_dashboard/profiling.py
+"""Latency profiling for the dashboard's callbacks.
+
+Every callback wrapped with metrics.timed_callback (every server-side
+callback) is timed as a whole. Callbacks split that time into phases by
+calling lap() at the end of each one ("filter", "aggregate", "figure"),
+and time after the last lap is counted as "other". Rolling p50/p95/p99
+over the last PROFILE_WINDOW calls are served as JSON at /profile and as
+Prometheus summaries in /metrics, with the running _sum and _count of
+every call since start.
+
+Set CALLBACK_PROFILE_SAMPLE_RATE (0-1) to run a stack sampler on that
+share of callback calls. Collapsed stacks are appended to
+CALLBACK_PROFILE_DIR/<callback>.folded, ready for flamegraph.pl,
+speedscope or inferno. /profile then also reports which library
+(plotly, pandas, numpy, ...) the sampled time was spent in.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_WINDOW = int(os.environ.get("CALLBACK_PROFILE_WINDOW", "1000"))
+SAMPLE_RATE = float(os.environ.get("CALLBACK_PROFILE_SAMPLE_RATE", "0"))
+SAMPLE_INTERVAL = float(os.environ.get("CALLBACK_PROFILE_INTERVAL", "0.001"))
+PROFILE_DIR = os.environ.get(
+    "CALLBACK_PROFILE_DIR", os.path.join(BASE_DIR, "data", ".cache", "profiles")
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Sampled time is attributed to the first of these packages entered below the callback
+LIBRARIES = ("plotly", "pandas", "numpy", "pyarrow", "json", "dash")
+
+
+class CallbackStats:
+    """Rolling durations of one callback, in total and per phase, plus sampled library time."""
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.total = deque(maxlen=window)
+        self.phases = defaultdict(lambda: deque(maxlen=window))
+        self.libraries = Counter()
+        self.calls = 0
+        # Since start, unlike the rolling windows: a summary's _sum and _count
+        self.sums = defaultdict(float)
+        self.counts = Counter()
+
+    def summary(self):
+        report = {
+            "calls": self.calls,
+            "total": _quantiles(self.total),
+            "phases": {phase: _quantiles(values) for phase, values in self.phases.items()},
+        }
+        samples = sum(self.libraries.values())
+        if samples:
+            report["sampled_time_share"] = {
+                library: round(count / samples, 3)
+                for library, count in self.libraries.most_common()
+            }
+        return report
+
+
+def _quantiles(values):
+    if not values:
+        return {}
+    return {
+        f"p{int(q * 100)}": float(value)
+        for q, value in zip(QUANTILES, np.quantile(np.fromiter(values, float), QUANTILES))
+    }
+
+
+STATS = defaultdict(CallbackStats)
+_stats_lock = threading.Lock()
+_file_lock = threading.Lock()
+_state = threading.local()
+
+
+class StackSampler:
+    """Samples one thread's Python stack below `root_frame` every `interval` seconds."""
+
+    def __init__(self, thread_id, root_frame, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks = Counter()
+        self.libraries = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="callback-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root_frame:
+                stack.append(frame)
+                frame = frame.f_back
+            if frame is None or not stack:  # The callback has already returned
+                continue
+            stack.reverse()
+            modules = [f.f_globals.get("__name__", "?") for f in stack]
+            self.stacks[
+                ";".join(f"{m}:{f.f_code.co_name}" for m, f in zip(modules, stack))
+            ] += 1
+            self.libraries[_library(modules)] += 1
+
+
+def _library(modules):
+    for module in modules:
+        package = module.split(".", 1)[0]
+        if package in LIBRARIES:
+            return "plotly.express" if module.startswith("plotly.express") else package
+    return "app"
+
+
+def _write_folded(name, stacks):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with _file_lock, open(os.path.join(PROFILE_DIR, f"{name}.folded"), "a") as f:
+        for stack, count in stacks.items():
+            f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_callback(name):
+    """Times the enclosed callback call under `name`; lap() inside it marks phases."""
+    started = time.perf_counter()
+    record = {"last": started, "phases": {}}
+    previous, _state.record = getattr(_state, "record", None), record
+    sampler = None
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        # The caller's frame, i.e. the callback wrapper; sampled stacks start below it
+        root_frame = sys._getframe(2)
+        sampler = StackSampler(threading.get_ident(), root_frame).start()
+    try:
+        yield record
+    finally:
+        finished = time.perf_counter()
+        _state.record = previous
+        phases = record["phases"]
+        if phases and finished > record["last"]:
+            phases["other"] = phases.get("other", 0.0) + finished - record["last"]
+        if sampler is not None:
+            sampler.stop()
+        with _stats_lock:
+            stats = STATS[name]
+            stats.calls += 1
+            stats.total.append(finished - started)
+            stats.sums["total"] += finished - started
+            stats.counts["total"] += 1
+            for phase, seconds in phases.items():
+                stats.phases[phase].append(seconds)
+                stats.sums[phase] += seconds
+                stats.counts[phase] += 1
+            if sampler is not None:
+                stats.libraries.update(sampler.libraries)
+        if sampler is not None and sampler.stacks:
+            _write_folded(name, sampler.stacks)
+
+
+def lap(phase):
+    """Ends `phase` of the running callback: time since the previous lap is added to it."""
+    record = getattr(_state, "record", None)
+    if record is None:
+        return
+    now = time.perf_counter()
+    record["phases"][phase] = record["phases"].get(phase, 0.0) + now - record["last"]
+    record["last"] = now
+
+
+def report():
+    """Rolling latency percentiles per callback, slowest p95 first."""
+    with _stats_lock:
+        summaries = {name: stats.summary() for name, stats in STATS.items()}
+    return dict(
+        sorted(summaries.items(), key=lambda item: -item[1]["total"].get("p95", 0.0))
+    )
+
+
+def render_prometheus():
+    """The rolling percentiles as Prometheus summaries, with _sum and _count since start."""
+    lines = [
+        "# HELP dash_callback_phase_seconds Rolling callback latency quantiles by phase",
+        "# TYPE dash_callback_phase_seconds summary",
+    ]
+    summaries = report()
+    with _stats_lock:
+        totals = {
+            name: (dict(STATS[name].sums), dict(STATS[name].counts)) for name in summaries
+        }
+    for name, summary in summaries.items():
+        sums, counts = totals[name]
+        phases = {"total": summary["total"], **summary["phases"]}
+        for phase, quantiles in phases.items():
+            labels = f'callback="{name}",phase="{phase}"'
+            for q, label in zip(QUANTILES, quantiles):
+                lines.append(
+                    f'dash_callback_phase_seconds{{{labels},quantile="{q}"}} {quantiles[label]}'
+                )
+            lines.append(f"dash_callback_phase_seconds_sum{{{labels}}} {sums.get(phase, 0.0)}")
+            lines.append(f"dash_callback_phase_seconds_count{{{labels}}} {counts.get(phase, 0)}")
+    return "\n".join(lines) + "\n"
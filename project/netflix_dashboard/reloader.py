@@ -0,0 +1,217 @@
+# netflix_dashboard/reloader.py
+"""Picks up changes to the catalogue CSV without restarting the workers.
+
+A daemon thread polls the file's size and mtime. When rows were only
+appended, just the new tail is read and prepared, and the count cube and
+multi-value indexes are extended instead of rebuilt. Any other change
+re-reads the CSV but re-prepares only the rows whose raw content changed.
+Either way the new Dataset is swapped in with a single assignment:
+requests already running keep the snapshot they started with, and the
+figure cache, keyed by dataset version, stops serving the old figures.
+
+    NETFLIX_RELOAD_INTERVAL=30 gunicorn app:server
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from app_logging import get_logger
+from aggregates import build_count_cube, merge_count_cubes
+from ingest import TitleDeduplicator
+from preparation import (
+    append_prepared,
+    apply_schema,
+    normalize_titles,
+    parse_dates,
+    prepare_rows,
+    raw_row_hashes,
+)
+
+# Seconds between polls of the CSV; 0 disables the reloader
+RELOAD_INTERVAL = float(os.environ.get("NETFLIX_RELOAD_INTERVAL", "0"))
+
+_RELOAD_LOCK = threading.Lock()
+
+logger = get_logger(__name__)
+
+
+def _digests(file_path, prefix_length):
+    """sha256 of the file's first `prefix_length` bytes and of the whole file, in one read."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        remaining = prefix_length
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        prefix = digest.hexdigest()
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return prefix, digest.hexdigest()
+
+
+def _read_appended_rows(file_path, offset):
+    """Parses the rows after byte `offset`, using the file's header line."""
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = f.read()
+    raw = pd.read_csv(io.BytesIO(header + tail))
+    # A column that is empty throughout the tail would otherwise parse as float
+    return raw.astype({c: object for c in raw.columns if raw[c].isna().all()})
+
+
+def _append(dataset, raw):
+    """The frame and derived structures of `dataset` plus the appended raw rows."""
+    dedup = TitleDeduplicator()
+    dedup.keep_mask(dataset.df["title"])
+    keep = dedup.keep_mask(raw["title"])
+    delta = prepare_rows(raw[keep].reset_index(drop=True))
+
+    load_report = dict(dataset.load_report)
+    load_report["rows_read"] = load_report.get("rows_read", 0) + len(raw)
+    load_report["duplicates_dropped"] = load_report.get("duplicates_dropped", 0) + int(
+        (~keep).sum()
+    )
+    for key, value in delta.attrs["load_report"].items():
+        load_report[key] = load_report.get(key, 0) + value
+
+    df = append_prepared(dataset.df, delta)
+    df.attrs["load_report"] = load_report
+    derived = {
+        "cube": merge_count_cubes(dataset.cube, build_count_cube(delta)),
+        "genre_index": dataset.genre_index.extend(delta["listed_in"]),
+        "country_index": dataset.country_index.extend(delta["country"]),
+    }
+    return df, derived
+
+
+def _rebuild(dataset, file_path):
+    """Re-reads the whole CSV, re-preparing only rows not already in `dataset`."""
+    raw = pd.read_csv(file_path)
+    rows_read = len(raw)
+    raw = raw[~normalize_titles(raw["title"]).duplicated(keep="first")]
+    raw = raw.reset_index(drop=True)
+
+    previous = pd.Index(dataset.df["source_row_hash"].to_numpy())
+    if not previous.is_unique:  # Only on a hash collision; nothing can be matched safely
+        previous = previous[:0]
+    matches = previous.get_indexer(raw_row_hashes(raw))
+    unchanged = np.flatnonzero(matches >= 0)
+    changed = np.flatnonzero(matches < 0)
+
+    reused = dataset.df.iloc[matches[unchanged]].set_axis(unchanged)
+    parts = [reused]
+    if len(changed):
+        parts.append(prepare_rows(raw.iloc[changed]))
+    df = apply_schema(pd.concat(parts).sort_index().reset_index(drop=True))
+
+    _, malformed = parse_dates(raw["date_added"])
+    df.attrs["load_report"] = {
+        "rows_read": rows_read,
+        "duplicates_dropped": rows_read - len(df),
+        "date_added_missing": int(raw["date_added"].isna().sum()),
+        "date_added_malformed": malformed,
+    }
+    logger.debug(
+        "Re-prepared changed rows",
+        extra={"rows_reused": len(unchanged), "rows_prepared": len(changed)},
+    )
+    return df, {}
+
+
+def reload_if_changed(file_path=None):
+    """Swaps in a new dataset version if the CSV changed; returns it, or None if unchanged."""
+    with _RELOAD_LOCK:
+        dataset = data_loader.current_dataset()
+        file_path = file_path or data_loader.DATA_PATH
+        if dataset is None:
+            df = data_loader.load_and_prepare_data(file_path)
+            if df is None:
+                return None
+            dataset = data_loader.Dataset(df)
+            data_loader.swap_dataset(dataset)
+            return dataset
+
+        source = dataset.source
+        stat = os.stat(file_path)
+        if (stat.st_size, stat.st_mtime_ns) == (source["size"], source["mtime_ns"]):
+            return None
+        prefix, digest = _digests(file_path, source["size"])
+        if digest == source["digest"]:  # Touched but not modified
+            source.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            return None
+
+        started = time.perf_counter()
+        appended = (
+            stat.st_size > source["size"]
+            and prefix == source["digest"]
+            and source["ends_with_newline"]
+        )
+        fingerprint = data_loader.source_fingerprint(file_path, digest)
+        with data_loader.cache_lock():
+            # Another worker may already have prepared this version
+            df = data_loader.read_prepared_cache(
+                fingerprint, file_path, zero_copy=data_loader.SHARED_DATA
+            )
+            derived = {}
+            if df is None:
+                if appended:
+                    df, derived = _append(dataset, _read_appended_rows(file_path, source["size"]))
+                else:
+                    df, derived = _rebuild(dataset, file_path)
+                if (
+                    data_loader.write_prepared_cache(df, fingerprint, file_path)
+                    and data_loader.SHARED_DATA
+                ):
+                    # Attach to the new file like every other worker; derived structures still apply
+                    shared_df = data_loader.read_prepared_cache(
+                        fingerprint, file_path, zero_copy=True
+                    )
+                    if shared_df is not None:
+                        df = shared_df
+
+        df.attrs["version"] = fingerprint
+        df.attrs["source"] = data_loader.source_info(file_path, digest)
+        new_dataset = data_loader.Dataset(df, **derived)
+        data_loader.swap_dataset(new_dataset)
+        logger.info(
+            "Dataset reloaded",
+            extra={
+                "path": file_path,
+                "kind": "append" if appended else "change",
+                "titles_before": len(dataset.df),
+                "titles_after": len(df),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "version": new_dataset.version,
+            },
+        )
+        return new_dataset
+
+
+def _watch(interval, file_path):
+    while True:
+        time.sleep(interval)
+        try:
+            reload_if_changed(file_path)
+        except Exception:  # Keep serving the current version and retry next poll
+            logger.exception(
+                "Reload failed", extra={"path": file_path or data_loader.DATA_PATH}
+            )
+
+
+def start_reloader(interval=RELOAD_INTERVAL, file_path=None):
+    """Polls the CSV every `interval` seconds in a daemon thread."""
+    thread = threading.Thread(
+        target=_watch, args=(interval, file_path), name="dataset-reloader", daemon=True
+    )
+    thread.start()
+    return thread
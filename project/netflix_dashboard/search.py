@@ -0,0 +1,175 @@
+# netflix_dashboard/search.py
+"""Inverted index for title, director and country search.
+
+Every field is normalized (lower case, accents dropped) and split into word
+tokens. The vocabulary is kept sorted, with each token's postings (title
+positions, ascending) stored back to back, so all tokens starting with a
+prefix form one contiguous run of postings. A typeahead query is answered
+from those runs without scanning any column:
+
+- every query word matches tokens that start with it; titles must match all words
+- a title scores, per word, the weight of the best field it matched in
+  (title > director > country), doubled when a token equals the word exactly
+- ties go to shorter titles, then to catalogue order
+"""
+import functools
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Searched columns, with the weight a match in each contributes to the score
+SEARCH_FIELDS = {"title": 3, "director": 2, "country": 1}
+EXACT_MATCH_BOOST = 2
+MAX_QUERY_TERMS = 8
+QUERY_CACHE_SIZE = 256
+
+# Any letter or digit run is a word (in every script), after accents are split off
+_WORD = re.compile(r"[^\W_]+")
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+
+
+def words(text):
+    """Lower-cased, accent-free words of `text`."""
+    text = str(text).lower()
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return _WORD.findall(text)
+
+
+def tokenize(text):
+    """Query words, normalized exactly like the indexed fields."""
+    return words(text or "")[:MAX_QUERY_TERMS]
+
+
+def _field_tokens(series):
+    """(title position, token) pairs of one column, tokenizing each distinct value once."""
+    codes, uniques = pd.factorize(series)
+    tokens = pd.Series(uniques, dtype=object).map(words).explode().dropna()
+    unique_ids = tokens.index.to_numpy(dtype=np.int64)
+    # Expand every (distinct value, token) pair to the titles having that value
+    present = np.flatnonzero(codes >= 0)
+    order = present[np.argsort(codes[present], kind="stable")]
+    counts = np.bincount(codes[present], minlength=len(uniques))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    repeats = counts[unique_ids]
+    pair = np.repeat(np.arange(len(unique_ids)), repeats)
+    within = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    rows = order[starts[unique_ids][pair] + within]
+    return rows, tokens.to_numpy(dtype=object)[pair]
+
+
+class SearchIndex:
+    """Sorted vocabulary plus CSR postings: vocabulary[i]'s titles are postings[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self, vocabulary, offsets, postings, weights, title_lengths):
+        self.vocabulary = vocabulary  # Sorted object array of tokens
+        self.offsets = offsets
+        self.postings = postings  # Title positions, ascending within a token
+        self.weights = weights  # Per posting, the weight of the best field holding the token
+        self.title_lengths = title_lengths
+        self.n_rows = len(title_lengths)
+        # Every score one posting can contribute, lowest first
+        field_weights = np.unique(list(SEARCH_FIELDS.values()))
+        self._levels = np.unique(np.concatenate([field_weights, field_weights * EXACT_MATCH_BOOST]))
+        self._scores = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._query_scores)
+
+    def _prefix_range(self, term):
+        """Positions in the vocabulary of the tokens starting with `term`."""
+        low = np.searchsorted(self.vocabulary, term, side="left")
+        high = np.searchsorted(self.vocabulary, term + "\U0010ffff", side="left")
+        return low, high
+
+    def _term_scores(self, term):
+        """Per-title score of one query word: its best weight over the tokens it prefixes."""
+        low, high = self._prefix_range(term)
+        start, stop = self.offsets[low], self.offsets[high]
+        rows = self.postings[start:stop]
+        weights = self.weights[start:stop]
+        if low < high and self.vocabulary[low] == term:
+            weights = weights.copy()
+            weights[: self.offsets[low + 1] - start] *= EXACT_MATCH_BOOST
+        scores = np.zeros(self.n_rows, dtype=np.uint8)
+        if high - low <= 1:
+            # One token lists each title once
+            scores[rows] = weights
+            return scores
+        # A title under several tokens keeps its best weight: with repeated
+        # indices the last assignment wins, so assign the levels lowest first
+        # (much faster than np.maximum.at)
+        for level in self._levels:
+            scores[rows[weights == level]] = level
+        return scores
+
+    def _query_scores(self, terms):
+        """(matching title positions ascending, their scores) for a tuple of query words."""
+        if not terms:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int16)
+        total = np.zeros(self.n_rows, dtype=np.int16)
+        matched = np.ones(self.n_rows, dtype=bool)
+        for term in terms:
+            scores = self._term_scores(term)
+            matched &= scores > 0
+            total += scores
+        rows = np.flatnonzero(matched)
+        return rows, total[rows]
+
+    def matches(self, query):
+        """Positions (ascending) of the titles matching every word of `query`."""
+        return self._scores(tuple(tokenize(query)))[0]
+
+    def search(self, query, limit=20):
+        """Best `limit` matches as (positions, scores), highest score first."""
+        rows, scores = self._scores(tuple(tokenize(query)))
+        # Score, then title length, then position as one sortable key, so
+        # only the best `limit` of possibly most of the catalogue get sorted
+        keys = (
+            (np.int64(np.iinfo(np.int16).max) - scores) << 48
+            | np.minimum(self.title_lengths[rows], 0xFFFF).astype(np.int64) << 32
+            | rows
+        )
+        if len(keys) > limit:
+            best = np.argpartition(keys, limit - 1)[:limit]
+            rows, scores, keys = rows[best], scores[best], keys[best]
+        order = np.argsort(keys)
+        return rows[order], scores[order]
+
+
+def build_search_index(df, fields=SEARCH_FIELDS):
+    """Builds the SearchIndex over a prepared frame's searched columns."""
+    rows, tokens, bits = [], [], []
+    for bit, column in enumerate(fields):
+        field_rows, field_tokens = _field_tokens(df[column])
+        rows.append(field_rows)
+        tokens.append(field_tokens)
+        bits.append(np.full(len(field_rows), 1 << bit, dtype=np.uint8))
+    rows, tokens, bits = np.concatenate(rows), np.concatenate(tokens), np.concatenate(bits)
+
+    codes, vocabulary = pd.factorize(tokens, sort=True)
+    order = np.lexsort((rows, codes))
+    codes, rows, bits = codes[order], rows[order], bits[order]
+    # A token appearing in several fields of one title becomes one posting
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    starts = np.flatnonzero(first)
+    fields_per_posting = np.bitwise_or.reduceat(bits, starts) if len(starts) else bits[:0]
+    codes, rows = codes[starts], rows[starts]
+    # Weight of the best field for every combination of field bits
+    weights = list(fields.values())
+    bit_weights = np.array(
+        [
+            max((w for i, w in enumerate(weights) if combination >> i & 1), default=0)
+            for combination in range(2 ** len(weights))
+        ],
+        dtype=np.uint8,
+    )
+
+    title_lengths = df["title"].astype("string").str.len().fillna(0).to_numpy(dtype=np.int32)
+    return SearchIndex(
+        vocabulary=np.asarray(vocabulary, dtype=object),
+        offsets=np.searchsorted(codes, np.arange(len(vocabulary) + 1)),
+        postings=rows.astype(np.int32),
+        weights=bit_weights[fields_per_posting],
+        title_lengths=title_lengths,
+    )
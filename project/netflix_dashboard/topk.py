@@ -0,0 +1,127 @@
+# netflix_dashboard/topk.py
+"""Top-N values per dimension, exact from sorted tables or approximate when streaming.
+
+TopK keeps each dimension's counts sorted once, for the whole catalogue and
+for each content type, so an unfiltered or type-only top N is a slice of N
+entries. Any other filter recounts the selected titles with one bincount
+and partially sorts only the best N values.
+
+SpaceSaving is the streaming counterpart for ingest.py: a fixed number of
+counters per dimension, however many distinct values the catalogue has.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _top_codes(counts, n):
+    """Codes of the `n` largest non-zero counts, largest first, ties in code order."""
+    # Count and code as one key, so argpartition keeps the stable tie order
+    keys = -counts.astype(np.int64) * len(counts) + np.arange(len(counts))
+    if len(keys) > n:
+        keys = keys[np.argpartition(keys, n - 1)[:n]]
+    keys.sort()
+    codes = keys % len(counts) if len(counts) else keys
+    return codes[counts[codes] > 0]
+
+
+class TopK:
+    """Sorted value counts of one dimension, overall and per content type.
+
+    Stored like MultiValueIndex, as (title position, value code) pairs, so
+    single- and multi-valued columns work the same way.
+    """
+
+    def __init__(self, rows, codes, values, n_rows, types=None):
+        self.rows = rows
+        self.codes = codes
+        self.values = values
+        self.n_rows = n_rows
+        self.tables = {None: self._table(codes)}
+        if types is not None:
+            type_codes = types.cat.codes.to_numpy()[rows]
+            for code, content_type in enumerate(types.cat.categories):
+                self.tables[content_type] = self._table(codes[type_codes == code])
+
+    def _table(self, codes):
+        counts = np.bincount(codes, minlength=len(self.values))
+        order = np.argsort(-counts, kind="stable")
+        order = order[counts[order] > 0]
+        return order, counts[order]
+
+    def top(self, n, mask=None, content_type=None):
+        """The `n` most frequent values and their title counts, largest first.
+
+        Without a `mask` this is a slice of the precomputed table for
+        `content_type` (None for every title); with one, the titles it
+        selects are recounted.
+        """
+        if mask is None:
+            if content_type not in self.tables:  # A type with no titles
+                return pd.Series(dtype=np.int64, name="count")
+            order, counts = self.tables[content_type]
+            order, counts = order[:n], counts[:n]
+        else:
+            counts = np.bincount(
+                self.codes[np.asarray(mask)[self.rows]], minlength=len(self.values)
+            )
+            order = _top_codes(counts, n)
+            counts = counts[order]
+        return pd.Series(counts, index=self.values[order], name="count")
+
+
+def build_top_k(series, types=None):
+    """TopK over a categorical column, optionally with per-`types` tables."""
+    codes = series.cat.codes.to_numpy()
+    rows = np.flatnonzero(codes >= 0)
+    return TopK(rows, codes[rows], series.cat.categories, len(series), types)
+
+
+def build_top_k_from_index(index, types=None):
+    """TopK over a MultiValueIndex: every listed value of a title is counted."""
+    return TopK(index.rows, index.codes, index.values, index.n_rows, types)
+
+
+class SpaceSaving:
+    """Approximate top values of a stream, in at most `capacity` counters.
+
+    Chunks are merged as exact per-chunk counts. A value not being tracked
+    may already have occurred up to the smallest tracked estimate, so it
+    enters with that added to its count and recorded as its error. Estimates
+    never undercount and estimate minus error never overcounts, and a value
+    occurring more often than the smallest tracked estimate is never dropped.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.estimates = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.total = 0
+
+    def update(self, counts):
+        """Adds one chunk's exact value counts (a Series of counts indexed by value)."""
+        counts = counts[counts > 0].astype(np.int64)
+        self.total += int(counts.sum())
+        floor = (
+            int(self.estimates.min()) if len(self.estimates) >= self.capacity else 0
+        )
+        index = self.estimates.index.union(counts.index)
+        estimates = self.estimates.reindex(index).fillna(floor).astype(np.int64)
+        errors = self.errors.reindex(index).fillna(floor).astype(np.int64)
+        estimates += counts.reindex(index, fill_value=0)
+        keep = estimates.sort_values(ascending=False, kind="stable").index[: self.capacity]
+        self.estimates, self.errors = estimates[keep], errors[keep]
+
+    def summary(self):
+        """Tracked values, highest estimate first: the estimate (an upper bound on
+        the count), its error, and estimate - error (a guaranteed lower bound)."""
+        return pd.DataFrame(
+            {
+                "estimate": self.estimates,
+                "error": self.errors,
+                "lower_bound": self.estimates - self.errors,
+            }
+        )
+
+    def top(self, n):
+        """summary() of the `n` values with the highest estimates."""
+        return self.summary().head(n)
@@ -0,0 +1,151 @@
+# netflix_dashboard/warmup.py
+"""Pre-renders every discrete callback state into the figure cache.
+
+Run it as a CLI before workers take traffic (most useful with
+FIGURE_CACHE_BACKEND=sqlite, where the cache is shared by every worker):
+
+    FIGURE_CACHE_BACKEND=sqlite python warmup.py
+
+or set FIGURE_CACHE_WARMUP=1 to have app.py warm its own cache in a
+background thread at startup.
+"""
+import itertools
+import threading
+import time
+
+from dash import dcc
+
+from app_logging import get_logger
+from figure_cache import FIGURE_CACHE, FIGURE_CACHE_BACKEND
+from pages import analysis_deep_dive, overview
+
+logger = get_logger(__name__)
+
+# Pathnames that render the overview page and so trigger the pie chart
+OVERVIEW_PATHNAMES = ["/", "/overview", None]
+# Only the unfiltered state is warmed: cross-filter selections are open-ended
+NO_CROSSFILTER = {}
+
+# Figure callbacks and the component ids of their inputs, in argument order
+WARMUP_CALLBACKS = [
+    (overview.update_content_type_pie, ["url", "crossfilter-store"]),
+    (
+        overview.update_top_countries_bar,
+        ["top-n-slider", "country-mode-radio", "crossfilter-store"],
+    ),
+    (overview.update_top_directors_bar, ["top-n-slider", "crossfilter-store"]),
+    (
+        analysis_deep_dive.update_genre_analysis,
+        ["genre-content-type-radio", "genre-top-n-dropdown", "crossfilter-store"],
+    ),
+    (
+        analysis_deep_dive.update_movie_duration_hist,
+        ["movie-duration-slider", "crossfilter-store"],
+    ),
+    (analysis_deep_dive.update_tv_season_bar, ["tv-season-slider", "crossfilter-store"]),
+    (
+        analysis_deep_dive.update_monthly_additions_line,
+        ["monthly-year-dropdown", "monthly-content-type-radio", "crossfilter-store"],
+    ),
+    (
+        analysis_deep_dive.update_rating_distribution_bar,
+        ["rating-filter-checklist", "crossfilter-store"],
+    ),
+]
+
+
+def _components_by_id(component, found=None):
+    """Walks a Dash component tree and returns {id: component}."""
+    found = {} if found is None else found
+    if getattr(component, "id", None) is not None:
+        found[component.id] = component
+    children = getattr(component, "children", None)
+    if isinstance(children, (list, tuple)):
+        for child in children:
+            _components_by_id(child, found)
+    elif children is not None and not isinstance(children, (str, int, float)):
+        _components_by_id(children, found)
+    return found
+
+
+def _input_domain(component):
+    """All values a component can send, or just its default for continuous ones."""
+    if isinstance(component, dcc.Slider):
+        return list(range(component.min, component.max + 1, component.step or 1))
+    if isinstance(component, dcc.RadioItems) or (
+        isinstance(component, dcc.Dropdown) and not getattr(component, "multi", False)
+    ):
+        return [option["value"] for option in component.options]
+    # Range sliders and multi-selects have combinatorial state spaces
+    return [component.value]
+
+
+def _page_components():
+    components = _components_by_id(overview.layout())
+    components.update(_components_by_id(analysis_deep_dive.layout()))
+    return components
+
+
+def _warmup_domain(input_id, components, default=False):
+    """Values warmed for one input: its whole domain, or just its default."""
+    if input_id == "url":
+        return OVERVIEW_PATHNAMES
+    if input_id == "crossfilter-store":
+        return [NO_CROSSFILTER]
+    if default:
+        return [components[input_id].value]
+    return _input_domain(components[input_id])
+
+
+def callback_states():
+    """Yields (callback, args) for every state enumerated for warm-up."""
+    components = _page_components()
+    for func, input_ids in WARMUP_CALLBACKS:
+        domains = [_warmup_domain(input_id, components) for input_id in input_ids]
+        for args in itertools.product(*domains):
+            yield func, args
+
+
+def default_states():
+    """Yields (callback, args) with each figure callback's inputs at their layout defaults."""
+    components = _page_components()
+    for func, input_ids in WARMUP_CALLBACKS:
+        yield func, tuple(
+            _warmup_domain(input_id, components, default=True)[0] for input_id in input_ids
+        )
+
+
+def warm_up():
+    """Renders every enumerated state into the figure cache; returns (entries, seconds)."""
+    started = time.perf_counter()
+    entries = 0
+    for func, args in callback_states():
+        func(*args)
+        entries += 1
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Figure cache warmed up",
+        extra={
+            "states": entries,
+            "duration_ms": round(elapsed * 1000, 2),
+            "entries_cached": len(FIGURE_CACHE),
+            "backend": FIGURE_CACHE_BACKEND,
+        },
+    )
+    return entries, elapsed
+
+
+def start_background_warmup():
+    """Runs warm_up() in a daemon thread so the server can start taking requests."""
+    thread = threading.Thread(target=warm_up, name="figure-cache-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    if FIGURE_CACHE_BACKEND == "memory":
+        print(
+            "Note: the memory backend is per-process; set FIGURE_CACHE_BACKEND=sqlite "
+            "to share this warm-up with the app's workers."
+        )
+    warm_up()